@@ -1,35 +1,423 @@
 from __future__ import annotations
 
 import os
+import re
 import json
-import base64
+import mmap
+import struct
+import asyncio
+import shutil
 import threading
 import decky
 import mimetypes
 import locale
 import unicodedata
+import heapq
+from array import array
+from collections import Counter
+from bisect import bisect_left, bisect_right, insort
 from pathlib import Path
 from typing import Optional
-from urllib.parse import quote
-from tinytag import TinyTag, Image
+from urllib.parse import quote, unquote
+from tinytag import TinyTag
 from http.server import SimpleHTTPRequestHandler
 from socketserver import ThreadingTCPServer
 
 locale.setlocale(locale.LC_COLLATE, "")
 
 config_file = Path("~/homebrew/settings/Music Player").expanduser() / "config.json"
+# columnar copy of the library and its metadata, mapped on start
+snapshot_file = config_file.parent / "library.snapshot"
 
 cover_art_path = Path(os.path.dirname(__file__)) / "assets/cover.png"
-fallback_cover_b64 = (
-    base64.b64encode(cover_art_path.read_bytes()).decode("ascii")
-    if cover_art_path.exists()
-    else None
-)
+cover_url_prefix = "/.cover/"
+# tag fields shown by the frontend, other metadata is skipped while parsing
+tag_fields = ("title", "artist", "album", "albumartist", "disc", "disc_total",
+              "track", "track_total", "genre", "year")
+# chained ogg files may contain several songs
+ogg_exts = {".ogg", ".oga", ".opus", ".spx"}
+# ranges are streamed in blocks of this size
+range_block_size = 1024 * 1024
+# most rows returned by one get_playlist_page call
+max_page_size = 500
+unsatisfiable_range = (-1, -1)
+
+def parse_byte_range(header: Optional[str], size: int):
+    # returns the inclusive (start, end) of a single byte range, None to serve
+    # the whole file, or unsatisfiable_range
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, sep, end = header[len("bytes="):].strip().partition("-")
+    if not sep or not (start or end) or not (start + end).isdigit():
+        return None
+    if not start:  # suffix range, the last bytes of the file
+        if int(end) == 0 or size == 0:
+            return unsatisfiable_range
+        return max(size - int(end), 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size:
+        return unsatisfiable_range
+    if end < start:
+        return None
+    return start, end
+
+def copy_range(src, dst, length: int):
+    while length > 0:
+        block = src.read(min(length, range_block_size))
+        if not block:
+            break
+        dst.write(block)
+        length -= len(block)
+
+class LibrarySnapshot:
+    # Columnar view of the library, memory-mapped from the snapshot file.
+    # Rows are tracks in playlist order. Strings and binary values of all
+    # rows are stored in one heap, column by column, and each of these
+    # columns is an array of row count + 1 offsets into it. Numbers are
+    # fixed-width arrays, 0 means unknown.
+    magic = b"MPLS"
+    version = 3
+    header = struct.Struct("<4sIIII")  # magic, version, rows, root size, heap size
+    string_columns = ("path", "title", "artist", "album", "albumartist", "genre", "search")
+    binary_columns = ("seek_table",)
+    number_columns = {"duration": "d", "duration_exact": "B", "track": "i", "disc": "i", "year": "i", "mtime": "q", "size": "q"}
+
+    def __init__(self, file: Path):
+        with open(file, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._file_id = self._stat_id(os.fstat(f.fileno()))
+        view = memoryview(self._mmap)
+        magic, version, self.count, root_size, heap_size = self.header.unpack_from(view)
+        if magic != self.magic or version != self.version:
+            raise ValueError("Unsupported library snapshot")
+        pos = self.header.size
+        self.root = Path(os.fsdecode(bytes(view[pos:pos + root_size])))
+        self._root_prefix = os.path.join(self.root, "")
+        pos += root_size
+        self.columns: dict[str, memoryview] = {}
+        for name, code, length in self._column_layout(self.count):
+            pos = self._align(pos)
+            end = pos + length * struct.calcsize(code)
+            self.columns[name] = view[pos:end].cast(code)
+            pos = end
+        self._heap_start = pos
+        self.heap = view[pos:pos + heap_size]
+        if len(self.heap) != heap_size:
+            raise ValueError("Truncated library snapshot")
+
+    @classmethod
+    def _column_layout(cls, count: int):
+        for name in cls.string_columns + cls.binary_columns:
+            yield name, "I", count + 1
+        for name, code in cls.number_columns.items():
+            yield name, code, count
+
+    @staticmethod
+    def _align(pos: int):
+        return (pos + 7) & ~7
+
+    @staticmethod
+    def _stat_id(stat: os.stat_result):
+        return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def is_current(self, file: Path):
+        # False once the file was replaced, e.g. by a newer snapshot
+        try:
+            return self._stat_id(file.stat()) == self._file_id
+        except OSError:
+            return False
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index: int) -> Path:
+        return self.root / self.string("path", index)
+
+    def string(self, column: str, index: int) -> str:
+        return str(self._heap_value(column, index), "utf-8", "surrogateescape")
+
+    def blob(self, column: str, index: int) -> bytes:
+        return bytes(self._heap_value(column, index))
+
+    def _heap_value(self, column: str, index: int):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Invalid track index")
+        offsets = self.columns[column]
+        return self.heap[offsets[index]:offsets[index + 1]]
+
+    def number(self, column: str, index: int):
+        return self.columns[column][index]
+
+    def row(self, index: int):
+        row = {name: self.string(name, index) for name in self.string_columns}
+        row.update((name, self.blob(name, index)) for name in self.binary_columns)
+        row.update((name, self.columns[name][index]) for name in self.number_columns)
+        return row
+
+    def track_info(self, index: int):
+        path = self.string("path", index)
+        filename = path.rpartition("/")[2]
+        return {
+            "index": index,
+            "filename": filename,
+            "full_path": self._root_prefix + path,
+            "title": self.string("title", index) or filename.rpartition(".")[0] or filename,
+            "artist": self.string("artist", index) or None,
+            "album": self.string("album", index) or None,
+            "duration": self.columns["duration"][index] or None,
+        }
+
+    def order(self, column: str, rows, descending: bool = False):
+        # sorts row indices by a column, strings in locale order
+        if column in self.number_columns:
+            key = self.columns[column].__getitem__
+        elif column in self.string_columns:
+            key = lambda index: locale.strxfrm(self.string(column, index).casefold())
+        else:
+            raise ValueError(f"Unknown column {column}")
+        return sorted(rows, key=key, reverse=descending)
+
+    def filter(self, query: str):
+        # rows whose title, artist, album or filename contain the query,
+        # found by searching the heap instead of decoding every row
+        needle = query.casefold().encode("utf-8", "surrogateescape")
+        offsets = self.columns["search"]
+        rows = []
+        if not needle:
+            return list(range(self.count))
+        pos = self._heap_start + offsets[0]
+        end = self._heap_start + offsets[self.count]
+        while (pos := self._mmap.find(needle, pos, end)) >= 0:
+            row = bisect_right(offsets, pos - self._heap_start) - 1
+            row_end = self._heap_start + offsets[row + 1]
+            if pos + len(needle) <= row_end:
+                rows.append(row)
+                pos = row_end
+            else:  # match spans two rows
+                pos += 1
+        return rows
+
+    @staticmethod
+    def search_text(row: dict):
+        return "\0".join((row["title"], row["artist"], row["album"], row["path"].rpartition("/")[2])).casefold()
+
+    @classmethod
+    def write(cls, file: Path, root: Path, rows: list[dict]):
+        heap = bytearray()
+        arrays = []
+        for name in cls.string_columns:
+            offsets = array("I", [len(heap)])
+            for row in rows:
+                heap += row[name].encode("utf-8", "surrogateescape")
+                offsets.append(len(heap))
+            arrays.append(offsets)
+        for name in cls.binary_columns:
+            offsets = array("I", [len(heap)])
+            for row in rows:
+                heap += row[name]
+                offsets.append(len(heap))
+            arrays.append(offsets)
+        for name, code in cls.number_columns.items():
+            arrays.append(array(code, (row[name] for row in rows)))
+        root_bytes = os.fsencode(root)
+        data = bytearray(cls.header.pack(cls.magic, cls.version, len(rows), len(root_bytes), len(heap)))
+        data += root_bytes
+        for column in arrays:
+            data += bytes(cls._align(len(data)) - len(data))
+            data += column.tobytes()
+        data += heap
+        # replaced atomically, mapped snapshots keep the old file contents
+        tmp_file = file.with_suffix(".tmp")
+        tmp_file.write_bytes(data)
+        os.replace(tmp_file, file)
+
+
+class SearchIndex:
+    # Inverted index from casefolded, accent-stripped words to the sorted
+    # indices of the tracks containing them. The vocabulary is kept sorted
+    # so a query word matches every word it is a prefix of.
+    word_pattern = re.compile(r"\w+")
+
+    def __init__(self):
+        self.postings: dict[str, list[int]] = {}
+        self.row_words: dict[int, tuple[str, ...]] = {}
+        self._vocabulary: Optional[list[str]] = None
+
+    @classmethod
+    def words(cls, text: str):
+        text = text.casefold()
+        if not text.isascii():
+            text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+        return cls.word_pattern.findall(text)
+
+    def add(self, row: int, text: str):
+        self.remove(row)
+        words = tuple(set(self.words(text)))
+        self.row_words[row] = words
+        for word in words:
+            rows = self.postings.get(word)
+            if rows is None:
+                self.postings[word] = [row]
+                if self._vocabulary is not None:
+                    insort(self._vocabulary, word)
+            elif rows[-1] < row:
+                rows.append(row)
+            else:
+                insort(rows, row)
+
+    def remove(self, row: int):
+        for word in self.row_words.pop(row, ()):
+            rows = self.postings[word]
+            rows.remove(row)
+            if not rows:
+                del self.postings[word]
+                if self._vocabulary is not None:
+                    del self._vocabulary[bisect_left(self._vocabulary, word)]
+
+    def vocabulary(self):
+        # sorted once after the initial build, then updated in place
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        return self._vocabulary
+
+    def prefixed(self, prefix: str):
+        vocabulary = self.vocabulary()
+        start = bisect_left(vocabulary, prefix)
+        return vocabulary[start:bisect_left(vocabulary, prefix + "\U0010ffff", start)]
+
+    def search(self, query: str, limit: int):
+        # first rows matching every query word, in playlist order
+        matches = [self.prefixed(word) for word in set(self.words(query))]
+        if not matches or limit <= 0:
+            return []
+        # the rarest word picks the candidates, the others only filter them
+        counts = [sum(len(self.postings[word]) for word in words) for words in matches]
+        rarest = min(range(len(matches)), key=counts.__getitem__)
+        words = matches[rarest]
+        filters = [set(other) for i, other in enumerate(matches) if i != rarest]
+        if limit * len(self.row_words) < len(words) * counts[rarest]:
+            # a short prefix matches so many words that walking the rows in
+            # order is faster than merging their postings
+            words = set(words)
+            candidates = (row for row in sorted(self.row_words) if not words.isdisjoint(self.row_words[row]))
+        else:
+            candidates = heapq.merge(*(self.postings[word] for word in words))
+        rows = []
+        last = -1
+        for row in candidates:
+            if row != last and all(not words.isdisjoint(self.row_words[row]) for words in filters):
+                rows.append(row)
+                if len(rows) == limit:
+                    break
+            last = row
+        return rows
+
+
+class LibraryFacets:
+    # Artist -> albums -> tracks grouping of the library. Albums are keyed by
+    # album artist, or artist if unset, and album title. Album ids stay the
+    # same while the plugin runs. Tracks are ordered by disc and number. The
+    # years and genres of the tracks are counted, an album has the earliest
+    # year and the most common genre of its current tracks.
+    def __init__(self):
+        self.albums: dict[int, dict] = {}
+        self.album_ids: dict[tuple[str, str], int] = {}
+        self.artist_albums: dict[str, set[int]] = {}
+        self.row_entries: dict[int, tuple[int, tuple[int, int, int], Optional[int], Optional[str]]] = {}
+        self.next_id = 0
+
+    def add(self, row: int, tags: dict):
+        self.remove(row)
+        artist = tags["albumartist"] or tags["artist"] or ""
+        key = (artist, tags["album"] or "")
+        album_id = self.album_ids.get(key)
+        if album_id is None:
+            album_id = self.album_ids[key] = self.next_id
+            self.next_id += 1
+            self.albums[album_id] = {"id": album_id, "artist": artist, "album": key[1], "years": Counter(), "genres": Counter(), "tracks": []}
+            self.artist_albums.setdefault(artist, set()).add(album_id)
+        album = self.albums[album_id]
+        year = tags["year"] or None
+        genre = tags["genre"] or None
+        if year:
+            album["years"][year] += 1
+        if genre:
+            album["genres"][genre] += 1
+        entry = (tags["disc"] or 0, tags["track"] or 0, row)
+        insort(album["tracks"], entry)
+        self.row_entries[row] = (album_id, entry, year, genre)
+
+    def remove(self, row: int):
+        album_id, entry, year, genre = self.row_entries.pop(row, (None, None, None, None))
+        if album_id is None:
+            return
+        album = self.albums[album_id]
+        tracks = album["tracks"]
+        del tracks[bisect_left(tracks, entry)]
+        for counts, value in ((album["years"], year), (album["genres"], genre)):
+            if value:
+                counts[value] -= 1
+                if not counts[value]:
+                    del counts[value]
+        if not tracks:
+            del self.albums[album_id]
+            del self.album_ids[(album["artist"], album["album"])]
+            artist_albums = self.artist_albums[album["artist"]]
+            artist_albums.discard(album_id)
+            if not artist_albums:
+                del self.artist_albums[album["artist"]]
+
+    def artists(self):
+        artists = [{
+            "artist": artist,
+            "albums": len(album_ids),
+            "tracks": sum(len(self.albums[i]["tracks"]) for i in album_ids),
+        } for artist, album_ids in self.artist_albums.items()]
+        return sorted(artists, key=lambda artist: locale.strxfrm(artist["artist"].casefold()))
+
+    def album_list(self, artist: Optional[str] = None):
+        # albums of one artist, or of all artists, by year then title
+        album_ids = self.albums if artist is None else self.artist_albums.get(artist, ())
+        albums = []
+        for album_id in album_ids:
+            album = self.albums[album_id]
+            genres = album["genres"].most_common(1)
+            albums.append({
+                "id": album_id,
+                "artist": album["artist"],
+                "album": album["album"],
+                "year": min(album["years"], default=None),
+                "genre": genres[0][0] if genres else None,
+                "tracks": len(album["tracks"]),
+            })
+        return sorted(albums, key=lambda album: (album["year"] or 0, locale.strxfrm(album["album"].casefold())))
+
+    def album_tracks(self, album_id: int):
+        album = self.albums.get(album_id)
+        if album is None:
+            raise ValueError(f"Unknown album {album_id}")
+        return [row for _, _, row in album["tracks"]]
+
 
 class Plugin:
     def __init__(self):
         self.playlist: list[Path] = []
-        self.playlist_meta: list[dict] = []
+        self.library: Optional[LibrarySnapshot] = None
+        # relative path of each track, its index and its url-quoted form
+        self.track_paths: list[str] = []
+        self.track_index: dict[str, int] = {}
+        self.track_urls: list[str] = []
+        self.search_index: Optional[SearchIndex] = None
+        self.facets: Optional[LibraryFacets] = None
+        self.playlist_meta: dict[int, dict] = {}
+        self.chapters: dict[int, list[dict]] = {}
+        # exact durations and seek tables by relative path, saved in the
+        # snapshot so the files are not scanned again on the next start
+        self.snapshot_updates: dict[str, dict] = {}
+        self.snapshot_lock = threading.Lock()
         self.http_port: int = 8082
         self.http_thread: Optional[threading.Thread] = None
         self.http_server: Optional[ThreadingTCPServer] = None
@@ -39,15 +427,167 @@ class Plugin:
         self.config = self._config()
 
         music_dir = Path(self.config["audio_library"]).expanduser()
+        self.playlist_meta: dict[int, dict] = {}
+        self.library = self._load_snapshot(music_dir)
+        if self.library is not None:
+            # the library as of the last run, rescanned in the background
+            self.playlist = self.library
+        elif music_dir.exists():
+            self.playlist = self._scan_library(music_dir)
+        if self.library is not None:
+            self._index_tracks([self.library.string("path", i) for i in range(len(self.library))])
+        else:
+            self._index_tracks([p.relative_to(music_dir).as_posix() for p in self.playlist])
         if music_dir.exists():
-            supported_exts = {ext.lower() for ext in TinyTag.SUPPORTED_FILE_EXTENSIONS}
-            self.playlist = sorted([p for p in music_dir.rglob("*")if p.is_file() and p.suffix.lower() in supported_exts], key=Plugin.sort_key)
-            self.playlist_meta: dict[int, dict] = {}
+            loop = asyncio.get_running_loop()
+            threading.Thread(target=self._refresh_snapshot, args=(music_dir, loop), daemon=True).start()
         if self.playlist and not self.config.get("last_played"):
-            self.config["last_played"] = self.playlist[0].name
+            self.config["last_played"] = self.track_paths[0]
             self._save_config()
         self._start_http_server()
 
+    @staticmethod
+    def _scan_library(music_dir: Path):
+        supported_exts = {ext.lower() for ext in TinyTag.SUPPORTED_FILE_EXTENSIONS}
+        return sorted([p for p in music_dir.rglob("*")if p.is_file() and p.suffix.lower() in supported_exts], key=Plugin.sort_key)
+
+    def _index_tracks(self, rel_paths: list[str]):
+        # tracks that were already indexed keep their quoted url
+        urls = {path: self.track_urls[i] for path, i in self.track_index.items()}
+        self.track_paths = rel_paths
+        self.track_index = {path: i for i, path in enumerate(rel_paths)}
+        self.track_urls = [urls.get(path) or quote(path) for path in rel_paths]
+
+    @staticmethod
+    def _load_snapshot(music_dir: Path):
+        try:
+            library = LibrarySnapshot(snapshot_file)
+        except (OSError, ValueError, struct.error):
+            return None
+        return library if library.root == music_dir else None
+
+    def _refresh_snapshot(self, music_dir: Path, loop: asyncio.AbstractEventLoop):
+        # Rewrites the snapshot and applies it to the running session. Runs
+        # on its own thread and only reads the plugin state, the results are
+        # handed over on the event loop. Rows of files that did not change
+        # are copied from the current snapshot instead of parsing tags.
+        try:
+            playlist = self.playlist
+            # built here so the first search or browse does not wait for them
+            indexes = self._build_indexes(playlist)
+            loop.call_soon_threadsafe(self._set_indexes, playlist, *indexes)
+            paths = self._scan_library(music_dir)
+            old = playlist if isinstance(playlist, LibrarySnapshot) else None
+            known = {old.string("path", i): i for i in range(len(old))} if old else {}
+            rows = []
+            rel_paths = []
+            # files changed since the old snapshot, their cached tags are stale
+            modified = set()
+            changed = old is None or len(old) != len(paths)
+            for path in paths:
+                stat = path.stat()
+                rel_path = path.relative_to(music_dir).as_posix()
+                rel_paths.append(rel_path)
+                index = known.get(rel_path)
+                if index is not None and old.number("mtime", index) == stat.st_mtime_ns and old.number("size", index) == stat.st_size:
+                    row = old.row(index)
+                    changed = changed or index != len(rows)
+                else:
+                    row = self._snapshot_row(path, rel_path, stat)
+                    if index is not None:
+                        modified.add(rel_path)
+                    changed = True
+                if rel_path not in modified:
+                    changed = self._apply_snapshot_updates(row) or changed
+                rows.append(row)
+            if not changed:
+                return
+            with self.snapshot_lock:
+                LibrarySnapshot.write(snapshot_file, music_dir, rows)
+                library = LibrarySnapshot(snapshot_file)
+            indexes = self._build_indexes(library)
+            loop.call_soon_threadsafe(self._set_library, playlist, library, rel_paths, modified, *indexes)
+        except Exception:
+            decky.logger.exception("Failed to refresh the library snapshot")
+
+    def _set_library(self, playlist, library: LibrarySnapshot, rel_paths: list[str], modified: set[str],
+                     search_index: SearchIndex, facets: LibraryFacets):
+        # Runs on the event loop. Tracks may have been added, removed or
+        # changed since the playlist was loaded, cached data of unchanged
+        # tracks moves to their new index.
+        if playlist is not self.playlist:
+            return
+        old_paths = self.track_paths
+        self._index_tracks(rel_paths)
+        for path in modified:
+            self.snapshot_updates.pop(path, None)
+        moved = {i: self.track_index[path] for i, path in enumerate(old_paths) if path in self.track_index and path not in modified}
+        self.playlist_meta = {moved[i]: meta for i, meta in self.playlist_meta.items() if i in moved}
+        self.chapters = {moved[i]: chapters for i, chapters in self.chapters.items() if i in moved}
+        self.library = library
+        self.playlist = library
+        self._set_indexes(library, search_index, facets)
+
+    def _apply_snapshot_updates(self, row: dict):
+        # copied first, the updates may change on the event loop meanwhile
+        updates = dict(self.snapshot_updates.get(row["path"]) or {})
+        if any(row[name] != value for name, value in updates.items()):
+            row.update(updates)
+            return True
+        return False
+
+    def _update_snapshot_row(self, index: int, **values):
+        self.snapshot_updates.setdefault(self.track_paths[index], {}).update(values)
+
+    def _save_snapshot_updates(self):
+        library = self.library
+        if library is None or not self.snapshot_updates:
+            return
+        rows = [library.row(i) for i in range(len(library))]
+        changed = False
+        for row in rows:
+            changed = self._apply_snapshot_updates(row) or changed
+        if changed:
+            try:
+                with self.snapshot_lock:
+                    # a refresh may have written a newer snapshot that was
+                    # not handed over yet, it already contains the updates
+                    # made before it was built
+                    if library.is_current(snapshot_file):
+                        LibrarySnapshot.write(snapshot_file, library.root, rows)
+            except OSError:
+                decky.logger.exception("Failed to save the library snapshot")
+
+    @staticmethod
+    def _snapshot_row(path: Path, rel_path: str, stat: os.stat_result):
+        try:
+            tag = TinyTag.get(path, fields=tag_fields)
+        except Exception:
+            tag = TinyTag()
+        year = (tag.year or "")[:4]
+        row = {
+            "path": rel_path,
+            "title": tag.title or "",
+            "artist": tag.artist or "",
+            "album": tag.album or "",
+            "albumartist": tag.albumartist or "",
+            "genre": tag.genre or "",
+            "duration": tag.duration or 0.0,
+            "duration_exact": 0,
+            "seek_table": b"",
+            "track": tag.track or 0,
+            "disc": tag.disc or 0,
+            "year": int(year) if year.isdigit() else 0,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+        # malformed tags may hold numbers too large for their column
+        for name in ("track", "disc"):
+            if not -0x80000000 <= row[name] <= 0x7fffffff:
+                row[name] = 0
+        row["search"] = LibrarySnapshot.search_text(row)
+        return row
+
     def _config(self):
         Path("~/homebrew/settings/Music Player").expanduser().mkdir(parents=True, exist_ok=True)
         if not config_file.exists():
@@ -59,16 +599,17 @@ class Plugin:
     def _save_config(self):
         config_file.write_text(json.dumps(self.config, indent=2))
 
-    def _read_tags(self, path: Path):
+    def _read_tags(self, index: int):
+        path = self.playlist[index]
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:  # removed since the library was scanned
+            mtime = 0
+        cover = self._cover_url(index, mtime)
         try:
-            tag = TinyTag.get(path, image=True)
+            tag = TinyTag.get(path, image=True, lazy_images=True, fields=tag_fields)
             image = tag.images.front_cover or tag.images.any if tag.images else None
-            if image and image.data:
-                cover = base64.b64encode(image.data).decode("ascii")
-                mime = image.mime_type
-            else:
-                cover = fallback_cover_b64
-                mime = "image/png"
+            mime = image.mime_type if image and image.size else "image/png"
             return {
                 "title": tag.title or path.stem,
                 "artist": tag.artist,
@@ -92,7 +633,11 @@ class Plugin:
                 "channels": tag.channels,
                 "bitdepth": getattr(tag, "bitdepth", None)
             }
-        except Exception as e:
+        except Exception:
+            try:
+                filesize = path.stat().st_size
+            except OSError:  # removed since the library was scanned
+                filesize = None
             return {
                 "title": path.stem,
                 "artist": None,
@@ -107,8 +652,8 @@ class Plugin:
                 "duration": None,
                 "mime_type": mimetypes.guess_type(str(path))[0],
                 "full_path": str(path),
-                "filesize": tag.filesize,
-                "cover": fallback_cover_b64,
+                "filesize": filesize,
+                "cover": cover,
                 "cover_mime": "image/png",
                 "filename": path.name,
                 "bitrate": None,
@@ -117,6 +662,21 @@ class Plugin:
                 "bitdepth": None,
             }
 
+    def _cover_url(self, index: int, mtime: int):
+        # keyed by path and version, indices change when the library is rescanned
+        return f"http://127.0.0.1:{self.http_port}{cover_url_prefix}{self.track_urls[index]}?v={mtime}"
+
+    @staticmethod
+    def _cover_image(path: Path):
+        # runs on the http server threads, the image stays in the file and
+        # only the tags before it are read
+        try:
+            tag = TinyTag.get(path, fields=(), duration=False, image=True, lazy_images=True)
+        except Exception:
+            return None
+        image = tag.images.front_cover or tag.images.any
+        return image if image and image.size else None
+
     @staticmethod
     def sort_key(path: Path):
         name = path.name
@@ -127,34 +687,224 @@ class Plugin:
             category = 0
         return (category, locale.strxfrm(name.casefold()))
 
-    async def get_playlist(self):
-        return [{"index": i, "filename": p.name, "full_path": str(p)} for i, p in enumerate(self.playlist)]
+    async def get_playlist(self, sort_by: Optional[str] = None, descending: bool = False, query: Optional[str] = None):
+        library = self.library
+        if library is None:
+            # no snapshot yet, only file names are known
+            playlist = [{"index": i, "filename": p.name, "full_path": str(p)} for i, p in enumerate(self.playlist)]
+            if query:
+                playlist = [track for track in playlist if query.casefold() in track["filename"].casefold()]
+            return playlist
+        rows = library.filter(query) if query else range(len(library))
+        if sort_by:
+            rows = library.order(sort_by, rows, descending)
+        return [library.track_info(i) for i in rows]
+
+    async def get_playlist_size(self):
+        return len(self.playlist)
+
+    async def get_playlist_page(self, offset: int, limit: int, fields: Optional[list[str]] = None):
+        # only the requested rows and columns cross the bridge, tags are
+        # parsed only for the rows of the page and only if a field needs them
+        offset = max(offset, 0)
+        end = min(offset + min(max(limit, 0), max_page_size), len(self.playlist))
+        fields = fields or ["index", "filename", "full_path"]
+        return [self._track_fields(i, fields) for i in range(offset, end)]
+
+    def _track_info(self, index: int):
+        # what is known about a track without reading the file
+        if self.library is not None:
+            info = self.library.track_info(index)
+            info["cover"] = self._cover_url(index, self.library.number("mtime", index))
+        else:
+            path = self.playlist[index]
+            info = {"index": index, "filename": path.name, "full_path": str(path)}
+        meta = self.playlist_meta.get(index)
+        if meta is not None:
+            info.update(meta)
+        return info
+
+    def _track_fields(self, index: int, fields: list[str]):
+        info = self._track_info(index)
+        if any(field not in info for field in fields):
+            info.update(self._track_meta(index))
+        return {field: info.get(field) for field in fields}
+
+    def _track_meta(self, index: int):
+        if index not in self.playlist_meta:
+            meta = self.playlist_meta[index] = self._read_tags(index)
+            if self.search_index is not None:
+                self.search_index.add(index, self._meta_search_text(meta))
+                self.facets.add(index, self._meta_facet_tags(meta))
+        return self.playlist_meta[index]
+
+    def _indexes(self):
+        # built on the refresh thread, or here if a search or browse comes first
+        if self.search_index is None:
+            self._set_indexes(self.playlist, *self._build_indexes(self.playlist))
+        return self.search_index, self.facets
+
+    @classmethod
+    def _build_indexes(cls, playlist):
+        # only reads the playlist, safe to run off the event loop
+        search_index = SearchIndex()
+        facets = LibraryFacets()
+        for i in range(len(playlist)):
+            search_index.add(i, cls._row_search_text(playlist, i))
+            tags = cls._row_facet_tags(playlist, i)
+            if tags is not None:
+                facets.add(i, tags)
+        search_index.vocabulary()
+        return search_index, facets
+
+    def _set_indexes(self, playlist, search_index: SearchIndex, facets: LibraryFacets):
+        # runs on the event loop, tags read while the indexes were built are added again
+        if playlist is not self.playlist:
+            return
+        for index, meta in self.playlist_meta.items():
+            search_index.add(index, self._meta_search_text(meta))
+            facets.add(index, self._meta_facet_tags(meta))
+        self.search_index = search_index
+        self.facets = facets
+
+    @staticmethod
+    def _row_search_text(playlist, index: int):
+        if isinstance(playlist, LibrarySnapshot):
+            return playlist.string("search", index)
+        return playlist[index].name
+
+    @staticmethod
+    def _meta_search_text(meta: dict):
+        return " ".join(meta[key] or "" for key in ("title", "artist", "album", "filename"))
+
+    @staticmethod
+    def _row_facet_tags(playlist, index: int):
+        if isinstance(playlist, LibrarySnapshot):
+            return {
+                "artist": playlist.string("artist", index),
+                "albumartist": playlist.string("albumartist", index),
+                "album": playlist.string("album", index),
+                "genre": playlist.string("genre", index),
+                "year": playlist.number("year", index) or None,
+                "disc": playlist.number("disc", index),
+                "track": playlist.number("track", index),
+            }
+        # nothing is known before the tags are read or the snapshot exists,
+        # such tracks are grouped once _track_meta reads their tags
+        return None
+
+    @staticmethod
+    def _meta_facet_tags(meta: dict):
+        year = str(meta["year"] or "")[:4]
+        return {
+            "artist": meta["artist"],
+            "albumartist": meta["albumartist"],
+            "album": meta["album"],
+            "genre": meta["genre"],
+            "year": int(year) if year.isdigit() else None,
+            "disc": meta["disc"],
+            "track": meta["track"],
+        }
+
+    async def get_artists(self):
+        return self._indexes()[1].artists()
+
+    async def get_albums(self, artist: Optional[str] = None):
+        return self._indexes()[1].album_list(artist)
+
+    async def get_album_tracks(self, album_id: int):
+        return [self._track_info(i) for i in self._indexes()[1].album_tracks(album_id)]
+
+    async def search(self, query: str, limit: int = 50, fields: Optional[list[str]] = None):
+        rows = self._indexes()[0].search(query, min(max(limit, 0), max_page_size))
+        fields = fields or ["index", "filename", "full_path"]
+        return [self._track_fields(i, fields) for i in rows]
 
     async def get_initial_track(self):
         last = self.config.get("last_played")
         if not last:
             return 0
-        for i, p in enumerate(self.playlist):
-            if p.name == last:
-                return i
-        return 0
+        index = self.track_index.get(last)
+        if index is None and "/" not in last:
+            # configs written before last_played held only the file name
+            index = next((i for i, path in enumerate(self.track_paths) if path.rpartition("/")[2] == last), None)
+        return index or 0
 
     async def load_track(self, index: int):
         if index < 0 or index >= len(self.playlist):
             raise IndexError("Invalid track index")
-        if index not in self.playlist_meta:
-            self.playlist_meta[index] = self._read_tags(self.playlist[index])
-        meta = self.playlist_meta[index]
-        self.config["last_played"] = meta["filename"]
+        meta = self._track_meta(index)
+        self.config["last_played"] = self.track_paths[index]
         self._save_config()
-        music_dir = Path(self.config["audio_library"]).expanduser()
-        rel_path = Path(meta["full_path"]).resolve().relative_to(music_dir.resolve())
-        return {"index": index, **meta, "url": f"http://127.0.0.1:{self.http_port}/{quote(rel_path.as_posix())}"}
+        return {"index": index, **meta, "url": f"http://127.0.0.1:{self.http_port}/{self.track_urls[index]}"}
 
     async def get_track_metadata(self, index: int):
-        if index not in self.playlist_meta:
-            self.playlist_meta[index] = self._read_tags(self.playlist[index])
-        return {"index": index, **self.playlist_meta[index]}
+        return {"index": index, **self._track_meta(index)}
+
+    async def get_chapters(self, index: int):
+        if index < 0 or index >= len(self.playlist):
+            raise IndexError("Invalid track index")
+        if index not in self.chapters:
+            path = self.playlist[index]
+            # links of chained ogg files are found while walking all pages
+            chained = path.suffix.lower() in ogg_exts
+            try:
+                # only the chapter atoms are parsed, other tags are skipped
+                tag = TinyTag.get(path, duration=chained, fields=("title", "artist") if chained else (), chapters=True)
+                chapters = tag.chapters or self._link_chapters(tag.links)
+            except Exception:
+                chapters = []
+            self.chapters[index] = [{"start": start, "title": title} for start, title in chapters]
+        return self.chapters[index]
+
+    @staticmethod
+    def _link_chapters(links: list[TinyTag]):
+        # each link of a chained ogg file is presented as a chapter
+        chapters = []
+        start = 0.0
+        for number, link in enumerate(links, start=1):
+            title = link.title or f"Part {number}"
+            chapters.append((start, f"{link.artist} - {title}" if link.artist else title))
+            start += link.duration or 0.0
+        return chapters
+
+    @staticmethod
+    def _seek_table_arrays(seek_table: list[tuple[float, int]]):
+        return array("d", [time for time, _ in seek_table]), array("Q", [offset for _, offset in seek_table])
+
+    @staticmethod
+    def _seek_table_bytes(seek_table: tuple[array, array]):
+        times, offsets = seek_table
+        return times.tobytes() + offsets.tobytes()
+
+    async def get_exact_duration(self, index: int):
+        if index < 0 or index >= len(self.playlist):
+            raise IndexError("Invalid track index")
+        meta = self._track_meta(index)
+        if not meta.get("duration_exact"):
+            playlist = self.playlist
+            if isinstance(playlist, LibrarySnapshot) and playlist.number("duration_exact", index):
+                # counted in an earlier session
+                meta["duration"] = playlist.number("duration", index)
+            elif playlist[index].suffix.lower() == ".mp3":
+                # counting all frames reads the whole file, keep it off the event loop
+                duration, seek_table = await asyncio.to_thread(self._exact_duration, playlist[index])
+                if duration:
+                    meta["duration"] = duration
+                # the frame scan also yields a seek table with one entry per second
+                if seek_table is not None and playlist is self.playlist:
+                    self._update_snapshot_row(index, duration=meta["duration"] or 0.0, duration_exact=1,
+                                              seek_table=self._seek_table_bytes(seek_table))
+            meta["duration_exact"] = True
+        return meta["duration"]
+
+    @classmethod
+    def _exact_duration(cls, path: Path):
+        try:
+            tag = TinyTag.get(path, tags=False, duration_mode="exact", seek_table=True)
+        except Exception:
+            return None, None
+        return tag.duration, cls._seek_table_arrays(tag.seek_table)
 
     async def get_volume(self):
         return float(self.config.get("volume", 1.0))
@@ -171,6 +921,7 @@ class Plugin:
         self._save_config()
         
     async def _unload(self):
+        self._save_snapshot_updates()
         if self.http_server:
             self.http_server.shutdown()
             self.http_server.server_close()
@@ -183,6 +934,7 @@ class Plugin:
         if not self.playlist:
             return
         music_dir = Path(self.config["audio_library"]).expanduser()
+        plugin = self
 
         class Handler(SimpleHTTPRequestHandler):
             def __init__(self, *args, **kwargs):
@@ -191,7 +943,41 @@ class Plugin:
             def log_message(self, *_):
                 pass
 
+            def send_cover(self, rel_path: str):
+                # read when requested, pages of the playlist only list the urls
+                rel_path = unquote(rel_path)
+                image = plugin._cover_image(music_dir / rel_path) if rel_path in plugin.track_index else None
+                if image is not None:
+                    mime = image.mime_type or "application/octet-stream"
+                    # sizes from tag headers may be wrong for damaged files,
+                    # the end of the image is marked by closing the connection
+                    size = None
+                elif cover_art_path.exists():
+                    mime = "image/png"
+                    size = cover_art_path.stat().st_size
+                else:
+                    self.send_error(404, "File not found")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", mime)
+                if size is None:
+                    self.close_connection = True
+                else:
+                    self.send_header("Content-Length", str(size))
+                self.send_header("Cache-Control", "max-age=3600")
+                self.end_headers()
+                if self.command == "HEAD":
+                    return
+                if image is not None:
+                    image.copy_to(self.wfile)
+                else:
+                    with open(cover_art_path, "rb") as f:
+                        shutil.copyfileobj(f, self.wfile)
+
             def send_head(self):
+                if self.path.startswith(cover_url_prefix):
+                    self.send_cover(self.path[len(cover_url_prefix):].split("?")[0])
+                    return None
                 path = self.translate_path(self.path)
                 if not os.path.isfile(path):
                     self.send_error(404, "File not found")
@@ -199,20 +985,29 @@ class Plugin:
                 f = open(path, "rb")
                 fs = os.fstat(f.fileno())
                 size = fs.st_size
-                range_header = self.headers.get("Range")
-                if range_header:
-                    start, end = range_header.replace("bytes=", "").split("-")
-                    start = int(start)
-                    end = int(end) if end else size - 1
+                byte_range = parse_byte_range(self.headers.get("Range"), size)
+                if byte_range == unsatisfiable_range:
+                    f.close()
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return None
+                if byte_range:
+                    start, end = byte_range
                     self.send_response(206)
                     self.send_header("Content-Type", self.guess_type(path))
                     self.send_header("Accept-Ranges", "bytes")
                     self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
                     self.send_header("Content-Length", str(end - start + 1))
                     self.end_headers()
-                    f.seek(start)
-                    self.wfile.write(f.read(end - start + 1))
-                    f.close()
+                    try:
+                        if self.command != "HEAD":
+                            # ranges of multi-GB files must not be read into memory at once
+                            f.seek(start)
+                            copy_range(f, self.wfile, end - start + 1)
+                    finally:
+                        f.close()
                     return None
                 self.send_response(200)
                 self.send_header("Content-Type", self.guess_type(path))
@@ -7,9 +7,10 @@ __version__ = '2.2.0'
 
 from .tinytag import (
     TinyTag, Image, Images, OtherFields, OtherImages,
-    TinyTagException, ParseError, UnsupportedFormatError
+    TinyTagException, ParseError, UnsupportedFormatError, BufferRangeError
 )
 __all__ = (
     "TinyTag", "Image", "Images", "OtherFields", "OtherImages",
-    "TinyTagException", "ParseError", "UnsupportedFormatError"
+    "TinyTagException", "ParseError", "UnsupportedFormatError",
+    "BufferRangeError"
 )
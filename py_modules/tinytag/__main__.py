@@ -92,7 +92,8 @@ def _run() -> int:
                 and not (TinyTag.is_supported(filename) and isfile(filename))):
             continue
         try:
-            tag = TinyTag.get(filename, image=image_path is not None)
+            tag = TinyTag.get(filename, image=image_path is not None,
+                              lazy_images=True)
             if image_path:
                 # allow for saving the image of multiple files
                 actual_image_path = image_path
@@ -102,7 +103,7 @@ def _run() -> int:
                 image = tag.images.any
                 if image is not None:
                     with open(actual_image_path, 'wb') as file_handle:
-                        file_handle.write(image.data)
+                        image.copy_to(file_handle)
             header_printed = _print_tag(tag, fmt, header_printed)
         except (OSError, TinyTagException) as exc:
             sys.stderr.write(f'{filename}: {exc}\n')
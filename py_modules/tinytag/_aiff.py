@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2014-2025 tinytag Contributors
+# SPDX-License-Identifier: MIT
+
+"""AIFF audio parser."""
+
+from __future__ import annotations
+from struct import Struct
+
+from ._id3 import _ID3
+from .tinytag import _UINT32_BE, ParseError, TinyTag
+
+TYPE_CHECKING = False
+
+# Lazy imports for type checking
+if TYPE_CHECKING:
+    from typing import BinaryIO  # pylint: disable-all
+
+
+class _Aiff(TinyTag):
+    """AIFF Parser.
+
+    https://en.wikipedia.org/wiki/Audio_Interchange_File_Format#Data_format
+    https://web.archive.org/web/20171118222232/http://www-mmsp.ece.mcgill.ca/documents/audioformats/aiff/aiff.html
+    https://web.archive.org/web/20071219035740/http://www.cnpbagwell.com/aiff-c.txt
+
+    A few things about the spec:
+
+    * IFF strings are not supposed to be null terminated, but sometimes
+      are.
+    * Some tools might throw more metadata into the ANNO chunk, but it is
+      wildly unreliable to count on it. In fact, the official spec
+      recommends against using it. That said... this code throws the
+      ANNO field into comment and hopes for the best.
+
+    The key thing here is that AIFF metadata is usually in a handful of
+    fields and the rest is an ID3 or XMP field.  XMP is too complicated
+    and only Adobe-related products support it. The vast majority use
+    ID3.
+    """
+
+    _READS_FILE_HEADER = True
+    _COMM_HEADER = Struct('>hLh')  # channels, frame count, bit depth
+    _EXTENDED = Struct('>HQ')  # 80-bit float exponent and mantissa
+
+    _AIFF_MAPPING = {
+        b'NAME': 'title',
+        b'AUTH': 'artist',
+        b'ANNO': 'comment',
+        b'(c) ': 'other.copyright',
+    }
+
+    def _parse_tag(self, fh: BinaryIO) -> None:
+        header = self._read_file_header(fh, 12)
+        if header[:4] != b'FORM' or header[8:12] not in {b'AIFC', b'AIFF'}:
+            raise ParseError('Invalid AIFF header')
+        header_len = 8
+        chunk_offset = 12
+        sound_data_found = False
+        chunk_header = fh.read(header_len)
+        while len(chunk_header) == header_len:
+            subchunk_id = chunk_header[:4]
+            subchunk_size = _UINT32_BE.unpack_from(chunk_header, 4)[0]
+            self._chunks.append(
+                (subchunk_id, chunk_offset + header_len, subchunk_size))
+            # IFF chunks are padded to an even number of bytes
+            subchunk_size += subchunk_size % 2
+            chunk_offset += header_len + subchunk_size
+            if (self._parse_tags and subchunk_id in self._AIFF_MAPPING
+                    and self._is_field_wanted(
+                        self._AIFF_MAPPING[subchunk_id])):
+                value = self._unpad(
+                    fh.read(subchunk_size).decode('utf-8', 'replace'))
+                self._set_field(self._AIFF_MAPPING[subchunk_id], value)
+            elif self._parse_duration and subchunk_id == b'COMM':
+                chunk = fh.read(subchunk_size)
+                channels, num_frames, bitdepth = (
+                    self._COMM_HEADER.unpack_from(chunk))
+                self.channels, self.bitdepth = channels, bitdepth
+                try:
+                    # Extended precision
+                    exp, mantissa = self._EXTENDED.unpack_from(chunk, 8)
+                    sr = int(mantissa * (2 ** (exp - 0x3FFF - 63)))
+                    duration = num_frames / sr
+                    bitrate = sr * channels * bitdepth / 1000
+                    self.samplerate, self.duration, self.bitrate = (
+                        sr, duration, bitrate)
+                except OverflowError:
+                    pass
+            elif subchunk_id == b'SSND':
+                sound_data_found = True
+            elif self._parse_tags and subchunk_id in {b'id3 ', b'ID3 '}:
+                # pylint: disable=protected-access
+                id3 = _ID3()
+                id3._filehandler = fh
+                id3._image_source = self._image_source
+                id3._fields = self._fields
+                id3._load(tags=True, duration=False, image=self._load_image)
+                self._update(id3)
+            # the sound data chunk is part of the directory for duration
+            # parsing, so callers can seek to the audio directly
+            if ((not self._parse_duration
+                    or (self.duration is not None and sound_data_found))
+                    and (not self._parse_tags or self._wanted_fields_found())):
+                break  # everything requested was found, skip the rest
+            # hop to the next chunk header, skipping unread chunk data
+            fh.seek(chunk_offset)
+            chunk_header = fh.read(header_len)
+        self._tags_parsed = True
+
+    def _determine_duration(self, fh: BinaryIO) -> None:
+        if not self._tags_parsed:
+            self._parse_tag(fh)
@@ -0,0 +1,141 @@
+# SPDX-FileCopyrightText: 2014-2025 tinytag Contributors
+# SPDX-License-Identifier: MIT
+
+"""FLAC audio parser."""
+
+from __future__ import annotations
+from io import BytesIO
+from os import SEEK_CUR
+from struct import Struct
+
+from ._id3 import _ID3
+from ._ogg import _Ogg
+from .tinytag import _UINT32_BE, _UINT64_BE, ParseError, TinyTag
+
+TYPE_CHECKING = False
+
+# Lazy imports for type checking
+if TYPE_CHECKING:
+    from typing import BinaryIO  # pylint: disable-all
+
+    from .tinytag import Image
+
+
+class _Flac(TinyTag):
+    """FLAC Parser."""
+
+    _READS_FILE_HEADER = True
+
+    _STREAMINFO = 0
+    _VORBIS_COMMENT = 4
+    _PICTURE = 6
+    _PICTURE_HEADER = Struct('>II')  # picture type, mime type length
+
+    def _determine_duration(self, fh: BinaryIO) -> None:
+        if not self._tags_parsed:
+            self._parse_tag(fh)
+
+    def _parse_tag(self, fh: BinaryIO) -> None:
+        id3 = None
+        header = self._read_file_header(fh, 4)
+        if header.startswith(b'ID3'):  # parse ID3 header if it exists
+            fh.seek(-4, SEEK_CUR)
+            # pylint: disable=protected-access
+            id3 = _ID3()
+            id3._parse_tags = self._parse_tags
+            id3._load_image = self._load_image
+            id3._fields = self._fields
+            id3._image_source = self._image_source
+            id3._parse_id3v2(fh)
+            header = fh.read(4)  # after ID3 should be fLaC
+        if header[:4] != b'fLaC':
+            raise ParseError('Invalid FLAC header')
+        # for spec, see https://xiph.org/flac/ogg_mapping.html
+        header_len = 4
+        block_header = fh.read(header_len)
+        while len(block_header) == header_len:
+            block_type = block_header[0] & 0x7f
+            is_last_block = block_header[0] & 0x80
+            size = _UINT32_BE.unpack(block_header)[0] & 0xFFFFFF
+            # http://xiph.org/flac/format.html#metadata_block_streaminfo
+            if self._parse_duration and block_type == self._STREAMINFO:
+                head = fh.read(size)
+                if len(head) < 34:  # invalid streaminfo
+                    break
+                # From the xiph documentation:
+                # py | <bits>
+                # ----------------------------------------------
+                # H  | <16>  The minimum block size (in samples)
+                # H  | <16>  The maximum block size (in samples)
+                # 3s | <24>  The minimum frame size (in bytes)
+                # 3s | <24>  The maximum frame size (in bytes)
+                # 8B | <20>  Sample rate in Hz.
+                #    | <3>   (number of channels)-1.
+                #    | <5>   (bits per sample)-1.
+                #    | <36>  Total samples in stream.
+                # 16s| <128> MD5 signature
+                #                 channels--.  bits      total samples
+                # |----- samplerate -----| |-||----| |---------~   ~----|
+                # 0000 0000 0000 0000 0000 0000 0000 0000 0000      0000
+                # #---4---# #---5---# #---6---# #---7---# #--8-~   ~-12-#
+                sr = _UINT32_BE.unpack_from(head, 10)[0] >> 12
+                self.channels = ((head[12] >> 1) & 0x07) + 1
+                self.bitdepth = (
+                    ((head[12] & 1) << 4) + ((head[13] & 0xF0) >> 4) + 1)
+                tot_samples = (_UINT64_BE.unpack_from(head, 10)[0]
+                               & 0xFFFFFFFFF)
+                self.duration = duration = tot_samples / sr
+                self.samplerate = sr
+                if duration > 0:
+                    self.bitrate = self.filesize * 8 / duration / 1000
+            elif self._parse_tags and block_type == self._VORBIS_COMMENT:
+                # pylint: disable=protected-access
+                block_offset = fh.tell()
+                walker = BytesIO(fh.read(size))
+                oggtag = _Ogg()
+                oggtag._load_image = self._load_image
+                oggtag._fields = self._fields
+                oggtag._image_source = self._image_source
+                oggtag._parse_vorbis_comment(walker, base_offset=block_offset)
+                self._update(oggtag)
+            elif self._load_image and block_type == self._PICTURE:
+                fieldname, value = self._parse_image(
+                    fh, self._image_source, self.filesize)
+                # pylint: disable=protected-access
+                self.images._set_field(fieldname, value)
+            else:
+                fh.seek(size, SEEK_CUR)  # seek over this block
+            if is_last_block:
+                break
+            block_header = fh.read(header_len)
+        if id3 is not None:  # apply ID3 tags after vorbis
+            self._update(id3)
+        self._tags_parsed = True
+
+    @classmethod
+    def _parse_image(
+        cls,
+        fh: BinaryIO,
+        image_source: str | BinaryIO | None = None,
+        filesize: int | None = None
+    ) -> tuple[str, Image]:
+        # https://xiph.org/flac/format.html#metadata_block_picture
+        pic_type, mime_type_len = cls._PICTURE_HEADER.unpack(fh.read(8))
+        mime_type = fh.read(mime_type_len).decode('utf-8', 'replace')
+        description_len = _UINT32_BE.unpack(fh.read(4))[0]
+        description = fh.read(description_len).decode('utf-8', 'replace')
+        fh.seek(16, SEEK_CUR)  # jump over width, height, depth, colors
+        pic_len = _UINT32_BE.unpack(fh.read(4))[0]
+        # pylint: disable=protected-access
+        if image_source is None:
+            return _ID3._create_tag_image(
+                fh.read(pic_len), pic_type, mime_type, description)
+        # skip the image data, it is read from the file when needed
+        offset = fh.tell()
+        if filesize is not None:  # the file may end before the picture does
+            pic_len = max(min(pic_len, filesize - offset), 0)
+        fh.seek(pic_len, SEEK_CUR)
+        fieldname, image = _ID3._create_tag_image(
+            b'', pic_type, mime_type, description)
+        image._set_file_range(image_source, offset, pic_len)
+        return fieldname, image
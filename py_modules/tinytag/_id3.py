@@ -0,0 +1,849 @@
+# SPDX-FileCopyrightText: 2014-2025 tinytag Contributors
+# SPDX-License-Identifier: MIT
+
+"""ID3 (MP3) audio parser."""
+
+from __future__ import annotations
+from os import SEEK_CUR
+from struct import Struct
+
+from .tinytag import _DEBUG, _UINT32_BE, Image, TinyTag
+
+TYPE_CHECKING = False
+
+# Lazy imports for type checking
+if TYPE_CHECKING:
+    from collections.abc import Sequence  # pylint: disable-all
+    from typing import BinaryIO
+
+
+class _ID3(TinyTag):
+    """MP3 Parser."""
+
+    _READS_FILE_HEADER = True
+
+    _ID3_MAPPING = {
+        # Mapping from Frame ID to a field of the TinyTag
+        # https://exiftool.org/TagNames/ID3.html
+        b'COMM': 'comment', b'COM': 'comment',
+        b'TRCK': 'track', b'TRK': 'track',
+        b'TYER': 'year', b'TYE': 'year', b'TDRC': 'year',
+        b'TALB': 'album', b'TAL': 'album',
+        b'TPE1': 'artist', b'TP1': 'artist',
+        b'TIT2': 'title', b'TT2': 'title',
+        b'TCON': 'genre', b'TCO': 'genre',
+        b'TPOS': 'disc', b'TPA': 'disc',
+        b'TPE2': 'albumartist', b'TP2': 'albumartist',
+        b'TCOM': 'composer', b'TCM': 'composer',
+        b'WOAR': 'other.url', b'WAR': 'other.url',
+        b'TSRC': 'other.isrc', b'TRC': 'other.isrc',
+        b'TCOP': 'other.copyright', b'TCR': 'other.copyright',
+        b'TBPM': 'other.bpm', b'TBP': 'other.bpm',
+        b'TKEY': 'other.initial_key', b'TKE': 'other.initial_key',
+        b'TLAN': 'other.language', b'TLA': 'other.language',
+        b'TPUB': 'other.publisher', b'TPB': 'other.publisher',
+        b'USLT': 'other.lyrics', b'ULT': 'other.lyrics',
+        b'TPE3': 'other.conductor', b'TP3': 'other.conductor',
+        b'TEXT': 'other.lyricist', b'TXT': 'other.lyricist',
+        b'TSST': 'other.set_subtitle',
+        b'TENC': 'other.encoded_by', b'TEN': 'other.encoded_by',
+        b'TSSE': 'other.encoder_settings', b'TSS': 'other.encoder_settings',
+        b'TMED': 'other.media', b'TMT': 'other.media',
+        b'WCOP': 'other.license',
+        b'MVNM': 'other.movement_name',
+        b'MVIN': 'other.movement',
+        b'GRP1': 'modern_grouping', b'GP1': 'modern_grouping',
+        b'TIT1': 'legacy_grouping', b'TT1': 'legacy_grouping',
+    }
+    _ID3_MAPPING_CUSTOM = {
+        'artists': 'artist',
+        'director': 'other.director',
+        'license': 'other.license',
+        'barcode': 'other.barcode',
+        'catalognumber': 'other.catalog_number',
+        'showmovement': 'other.show_movement'
+    }
+    _GROUPING_FIELD_NAMES = {
+        # see _set_grouping_work_fields()
+        'modern_grouping': ('other.grouping',),
+        'legacy_grouping': ('other.grouping', 'other.work'),
+    }
+    _EMPTY_FRAME_IDS = {b'\x00\x00\x00\x00', b'\x00\x00\x00'}
+    _IMAGE_FRAME_IDS = {b'APIC', b'PIC'}
+    _CUSTOM_FRAME_IDS = {b'TXXX', b'TXX'}
+    _SYNCED_LYRICS_FRAME_IDS = {b'SYLT', b'SLT'}
+    _IGNORED_FRAME_IDS = {
+        b'AENC', b'CRA',
+        b'APIC', b'PIC',
+        b'ASPI',
+        b'ATXT',
+        b'CHAP',
+        b'COMR',
+        b'CRM',
+        b'CTOC',
+        b'ENCR',
+        b'EQU2', b'EQU',
+        b'ETCO', b'ETC',
+        b'GEOB', b'GEO',
+        b'GRID',
+        b'LINK', b'LNK',
+        b'MCDI', b'MCI',
+        b'MLLT', b'MLL',
+        b'PCNT', b'CNT',
+        b'POPM', b'POP',
+        b'POSS',
+        b'PRIV',
+        b'RBUF', b'BUF',
+        b'RGAD',
+        b'RVA2', b'RVA',
+        b'RVRB', b'REV',
+        b'SEEK',
+        b'SIGN',
+        b'SYTC', b'STC',
+    }
+    _ID3V1_TAG_SIZE = 128
+    _MAX_ESTIMATION_SEC = 30.0
+    _CBR_DETECTION_FRAME_COUNT = 5
+    _USE_XING_HEADER = True  # much faster, but can be deactivated for testing
+    _SEEK_TABLE_INTERVAL = 1.0  # seconds between seek table entries
+    _SCAN_BLOCK_SIZE = 1 << 20  # bytes read at once when counting frames
+    _INT32_BE = Struct('>i')  # Xing header flags and counts
+
+    _ID3V1_GENRES = (
+        'Blues', 'Classic Rock', 'Country', 'Dance', 'Disco',
+        'Funk', 'Grunge', 'Hip-Hop', 'Jazz', 'Metal', 'New Age', 'Oldies',
+        'Other', 'Pop', 'R&B', 'Rap', 'Reggae', 'Rock', 'Techno', 'Industrial',
+        'Alternative', 'Ska', 'Death Metal', 'Pranks', 'Soundtrack',
+        'Euro-Techno', 'Ambient', 'Trip-Hop', 'Vocal', 'Jazz+Funk', 'Fusion',
+        'Trance', 'Classical', 'Instrumental', 'Acid', 'House', 'Game',
+        'Sound Clip', 'Gospel', 'Noise', 'AlternRock', 'Bass', 'Soul', 'Punk',
+        'Space', 'Meditative', 'Instrumental Pop', 'Instrumental Rock',
+        'Ethnic', 'Gothic', 'Darkwave', 'Techno-Industrial', 'Electronic',
+        'Pop-Folk', 'Eurodance', 'Dream', 'Southern Rock', 'Comedy', 'Cult',
+        'Gangsta', 'Top 40', 'Christian Rap', 'Pop/Funk', 'Jungle',
+        'Native American', 'Cabaret', 'New Wave', 'Psychadelic', 'Rave',
+        'Showtunes', 'Trailer', 'Lo-Fi', 'Tribal', 'Acid Punk', 'Acid Jazz',
+        'Polka', 'Retro', 'Musical', 'Rock & Roll', 'Hard Rock',
+        # Wimamp Extended Genres
+        'Folk', 'Folk-Rock', 'National Folk', 'Swing', 'Fast Fusion', 'Bebob',
+        'Latin', 'Revival', 'Celtic', 'Bluegrass', 'Avantgarde', 'Gothic Rock',
+        'Progressive Rock', 'Psychedelic Rock', 'Symphonic Rock', 'Slow Rock',
+        'Big Band', 'Chorus', 'Easy listening', 'Acoustic', 'Humour', 'Speech',
+        'Chanson', 'Opera', 'Chamber Music', 'Sonata', 'Symphony',
+        'Booty Bass', 'Primus', 'Porn Groove', 'Satire', 'Slow Jam', 'Club',
+        'Tango', 'Samba', 'Folklore', 'Ballad', 'Power Ballad',
+        'Rhythmic Soul', 'Freestyle', 'Duet', 'Punk Rock', 'Drum Solo',
+        'A capella', 'Euro-House', 'Dance Hall', 'Goa', 'Drum & Bass',
+        'Club-House', 'Hardcore Techno', 'Terror', 'Indie', 'BritPop',
+        'Afro-Punk', 'Polsk Punk', 'Beat', 'Christian Gangsta Rap',
+        'Heavy Metal', 'Black Metal', 'Contemporary Christian',
+        'Christian Rock',
+        # WinAmp 1.91
+        'Merengue', 'Salsa', 'Thrash Metal', 'Anime', 'Jpop', 'Synthpop',
+        # WinAmp 5.6
+        'Abstract', 'Art Rock', 'Baroque', 'Bhangra', 'Big Beat', 'Breakbeat',
+        'Chillout', 'Downtempo', 'Dub', 'EBM', 'Eclectic', 'Electro',
+        'Electroclash', 'Emo', 'Experimental', 'Garage', 'Illbient',
+        'Industro-Goth', 'Jam Band', 'Krautrock', 'Leftfield', 'Lounge',
+        'Math Rock', 'New Romantic', 'Nu-Breakz', 'Post-Punk', 'Post-Rock',
+        'Psytrance', 'Shoegaze', 'Space Rock', 'Trop Rock', 'World Music',
+        'Neoclassical', 'Audiobook', 'Audio Theatre', 'Neue Deutsche Welle',
+        'Podcast', 'Indie Rock', 'G-Funk', 'Dubstep', 'Garage Rock',
+        'Psybient',
+    )
+    _ID3V2_2_IMAGE_FORMATS = {
+        b'bmp': 'image/bmp',
+        b'jpg': 'image/jpeg',
+        b'png': 'image/png',
+    }
+    _IMAGE_TYPES = (
+        'other.generic',
+        'other.icon',
+        'other.alt_icon',
+        'front_cover',
+        'back_cover',
+        'other.leaflet',
+        'media',
+        'other.lead_artist',
+        'other.artist',
+        'other.conductor',
+        'other.band',
+        'other.composer',
+        'other.lyricist',
+        'other.recording_location',
+        'other.during_recording',
+        'other.during_performance',
+        'other.screen_capture',
+        'other.bright_colored_fish',
+        'other.illustration',
+        'other.band_logo',
+        'other.publisher_logo',
+    )
+    _UNKNOWN_IMAGE_TYPE = 'other.unknown'
+
+    # see this page for the magic values used in mp3:
+    # http://www.mpgedit.org/mpgedit/mpeg_format/mpeghdr.htm
+    _SAMPLE_RATES = (
+        (11025, 12000, 8000),   # MPEG 2.5
+        (0, 0, 0),              # reserved
+        (22050, 24000, 16000),  # MPEG 2
+        (44100, 48000, 32000),  # MPEG 1
+    )
+    _V1L1 = (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416,
+             448, 0)
+    _V1L2 = (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320,
+             384, 0)
+    _V1L3 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256,
+             320, 0)
+    _V2L1 = (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224,
+             256, 0)
+    _V2L2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0)
+    _V2L3 = _V2L2
+    _NONE = (0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    _BITRATE_VERSION_LAYERS = (
+        # note that layers go from 3 to 1 by design, first layer id is reserved
+        (_NONE, _V2L3, _V2L2, _V2L1),  # MPEG Version 2.5
+        (_NONE, _NONE, _NONE, _NONE),  # reserved
+        (_NONE, _V2L3, _V2L2, _V2L1),  # MPEG Version 2
+        (_NONE, _V1L3, _V1L2, _V1L1),  # MPEG Version 1
+    )
+    _SAMPLES_PER_FRAME = 1152  # the default frame size for mp3
+    _CHANNELS_PER_CHANNEL_MODE = (
+        2,  # 00 Stereo
+        2,  # 01 Joint stereo (Stereo)
+        2,  # 10 Dual channel (2 mono channels)
+        1,  # 11 Single channel (Mono)
+    )
+
+    def __init__(self) -> None:
+        super().__init__()
+        # save position after the ID3 tag for duration measurement speedup
+        self._bytepos_after_id3v2 = -1
+        self._modern_grouping_values: list[str] = []
+        self._legacy_grouping_values: list[str] = []
+
+    @classmethod
+    def _parse_xing_header(cls, fh: BinaryIO) -> tuple[int, int, bytes]:
+        # see: http://www.mp3-tech.org/programmer/sources/vbrheadersdk.zip
+        fh.seek(4, SEEK_CUR)  # read over Xing header
+        header_flags = cls._INT32_BE.unpack(fh.read(4))[0]
+        frames = byte_count = 0
+        toc = b''
+        if header_flags & 1:  # FRAMES FLAG
+            frames = cls._INT32_BE.unpack(fh.read(4))[0]
+        if header_flags & 2:  # BYTES FLAG
+            byte_count = cls._INT32_BE.unpack(fh.read(4))[0]
+        if header_flags & 4:  # TOC FLAG
+            # byte positions of each percent of the duration, in 1/256 steps
+            toc = fh.read(100)
+            if len(toc) != 100:
+                toc = b''
+        if header_flags & 8:  # VBR SCALE FLAG
+            fh.seek(4, SEEK_CUR)
+        return frames, byte_count, toc
+
+    def _determine_duration(self, fh: BinaryIO) -> None:
+        # if tag reading was disabled, find start position of audio data
+        if self._bytepos_after_id3v2 == -1:
+            self._parse_id3v2_header(fh)
+
+        max_estimation_frames = (
+            (self._MAX_ESTIMATION_SEC * 44100) // self._SAMPLES_PER_FRAME)
+        frame_size_accu = 0
+        audio_offset = self._bytepos_after_id3v2
+        frames = 0  # count frames for determining mp3 duration
+        bitrate_accu = 0    # add up bitrates to find average bitrate to detect
+        last_bitrates = set()  # CBR mp3s (multiple frames with same bitrates)
+        # seek to first position after id3 tag (speedup for large header)
+        first_mpeg_id = None
+        fh.seek(self._bytepos_after_id3v2)
+        while True:
+            # reading through garbage until 11 '1' sync-bits are found
+            header = fh.read(4)
+            header_len = len(header)
+            if header_len < 4:
+                if frames:
+                    self.bitrate = bitrate_accu / frames
+                break  # EOF
+            conf, bitrate_freq, rest = header[1], header[2], header[3]
+            br_id = (bitrate_freq >> 4) & 0x0F  # biterate id
+            sr_id = (bitrate_freq >> 2) & 0x03  # sample rate id
+            padding = 1 if bitrate_freq & 0x02 > 0 else 0
+            mpeg_id = (conf >> 3) & 0x03
+            layer_id = (conf >> 1) & 0x03
+            channel_mode = (rest >> 6) & 0x03
+            # check for eleven 1s, validate bitrate and sample rate
+            if (header[:2] <= b'\xFF\xE0'
+                    or (first_mpeg_id is not None and first_mpeg_id != mpeg_id)
+                    or br_id > 14 or br_id == 0 or sr_id == 3 or layer_id == 0
+                    or mpeg_id == 1):
+                # invalid frame, find next sync header
+                idx = header.find(b'\xFF', 1)
+                next_offset = header_len
+                if idx != -1:
+                    next_offset -= idx
+                    fh.seek(idx - header_len, SEEK_CUR)
+                if frames == 0:
+                    audio_offset += next_offset
+                continue
+            if first_mpeg_id is None:
+                first_mpeg_id = mpeg_id
+            self.channels = self._CHANNELS_PER_CHANNEL_MODE[channel_mode]
+            frame_br = self._BITRATE_VERSION_LAYERS[mpeg_id][layer_id][br_id]
+            self.samplerate = samplerate = self._SAMPLE_RATES[mpeg_id][sr_id]
+            frame_length = (144000 * frame_br) // samplerate + padding
+            # MPEG-2 Audio Layer III uses 576 samples per frame
+            samples_pf = self._SAMPLES_PER_FRAME
+            if mpeg_id <= 2:
+                samples_pf = 576
+            # There might be a xing header in the first frame that contains
+            # all the info we need, otherwise parse multiple frames to find the
+            # accurate average bitrate
+            if (frames == 0 and self._USE_XING_HEADER
+                    and not self._exact_duration):
+                prev_offset = header_len + audio_offset
+                frame_content = fh.read(frame_length)
+                xing_header_offset = frame_content.find(b'Xing')
+                if xing_header_offset != -1:
+                    fh.seek(prev_offset + xing_header_offset)
+                    xframes, byte_count, toc = self._parse_xing_header(fh)
+                    if xframes > 0 and byte_count > 0 and (
+                            toc or not self._load_seek_table):
+                        self.duration = dur = xframes * samples_pf / samplerate
+                        self.bitrate = byte_count * 8 / dur / 1000
+                        if self._load_seek_table:
+                            self._seek_table = [
+                                (dur * percent / 100,
+                                 audio_offset + byte_count * pos // 256)
+                                for percent, pos in enumerate(toc)]
+                        return
+                fh.seek(prev_offset)
+
+            if self._exact_duration or self._load_seek_table:
+                # count all frames, and record their offsets
+                self._scan_frames(fh, fh.tell() - header_len, conf)
+                return
+
+            frames += 1  # it's most probably a mp3 frame
+            bitrate_accu += frame_br
+            if frames <= self._CBR_DETECTION_FRAME_COUNT:
+                last_bitrates.add(frame_br)
+
+            frame_size_accu += frame_length
+            # if bitrate does not change over time its probably CBR
+            is_cbr = (frames == self._CBR_DETECTION_FRAME_COUNT
+                      and len(last_bitrates) == 1)
+            if frames == max_estimation_frames or is_cbr:
+                # try to estimate duration
+                stream_size = (
+                    self.filesize - audio_offset - self._ID3V1_TAG_SIZE)
+                est_frame_count = stream_size / (frame_size_accu / frames)
+                samples = est_frame_count * self._SAMPLES_PER_FRAME
+                self.duration = samples / samplerate
+                self.bitrate = bitrate_accu / frames
+                return
+
+            if frame_length > 1:  # jump over current frame body
+                fh.seek(frame_length - header_len, SEEK_CUR)
+        if self.samplerate:
+            self.duration = frames * self._SAMPLES_PER_FRAME / self.samplerate
+
+    def _frame_info(self, header: int, mpeg_id: int) -> tuple[int, int, int]:
+        # length, bitrate and sample count of a frame, from the second and
+        # third header bytes; zero length for invalid headers
+        conf, bitrate_freq = header >> 8, header & 0xFF
+        layer_id = (conf >> 1) & 0x03
+        br_id = (bitrate_freq >> 4) & 0x0F
+        sr_id = (bitrate_freq >> 2) & 0x03
+        if (conf < 0xE1 or (conf >> 3) & 0x03 != mpeg_id or layer_id == 0
+                or br_id > 14 or br_id == 0 or sr_id == 3):
+            return 0, 0, 0
+        padding = 1 if bitrate_freq & 0x02 else 0
+        frame_br = self._BITRATE_VERSION_LAYERS[mpeg_id][layer_id][br_id]
+        samplerate = self._SAMPLE_RATES[mpeg_id][sr_id]
+        if layer_id == 3:  # Layer I uses 4 byte slots
+            frame_length = ((12000 * frame_br) // samplerate + padding) * 4
+            return frame_length, frame_br, 384
+        if layer_id == 1 and mpeg_id <= 2:  # MPEG-2 Layer III
+            frame_length = (72000 * frame_br) // samplerate + padding
+            return frame_length, frame_br, 576
+        frame_length = (144000 * frame_br) // samplerate + padding
+        return frame_length, frame_br, self._SAMPLES_PER_FRAME
+
+    def _scan_frames(self, fh: BinaryIO, pos: int, conf: int) -> None:
+        # Walk all frames of the stream in large blocks. Frame headers are
+        # looked up in a table, since a stream only uses a few of them.
+        mpeg_id = (conf >> 3) & 0x03
+        frame_infos: dict[int, tuple[int, int, int]] = {}
+        samplerate = self.samplerate or 1
+        load_seek_table = self._load_seek_table
+        seek_table: list[tuple[float, int]] = []
+        next_seek_time = 0.0
+        frames = samples = bitrate_accu = 0
+        block_size = self._SCAN_BLOCK_SIZE
+        fh.seek(pos)
+        buffer = fh.read(block_size)
+        offset = 0
+        # the first frame may only contain a Xing or LAME info header
+        info = self._frame_info(buffer[1] << 8 | buffer[2], mpeg_id)
+        first_frame = buffer[4:info[0]]
+        if b'Xing' in first_frame or b'Info' in first_frame:
+            offset = info[0]
+        while True:
+            if offset + 4 > len(buffer):
+                block = fh.read(block_size)
+                if not block:
+                    break
+                pos += offset
+                buffer = buffer[offset:] + block
+                offset = 0
+                continue
+            if buffer[offset] != 0xFF:  # find next sync header
+                offset = buffer.find(b'\xFF', offset + 1)
+                if offset == -1:
+                    offset = len(buffer)
+                continue
+            header = buffer[offset + 1] << 8 | buffer[offset + 2]
+            info = frame_infos.get(header)
+            if info is None:
+                info = frame_infos[header] = self._frame_info(header, mpeg_id)
+            frame_length, frame_br, frame_samples = info
+            if not frame_length:
+                offset += 1
+                continue
+            if load_seek_table:
+                frame_time = samples / samplerate
+                if frame_time >= next_seek_time:
+                    seek_table.append((frame_time, pos + offset))
+                    next_seek_time += self._SEEK_TABLE_INTERVAL
+            frames += 1
+            samples += frame_samples
+            bitrate_accu += frame_br
+            offset += frame_length
+        if frames:
+            self.duration = samples / samplerate
+            self.bitrate = bitrate_accu / frames
+        self._seek_table = seek_table
+
+    def _parse_tag(self, fh: BinaryIO) -> None:
+        self._parse_id3v2(fh)
+        if self.filesize >= self._ID3V1_TAG_SIZE:
+            # try parsing id3v1 at the end of file
+            fh.seek(self.filesize - self._ID3V1_TAG_SIZE)
+            self._parse_id3v1(fh)
+
+    def _parse_id3v2_header(self, fh: BinaryIO) -> tuple[int, int, int]:
+        size = major = flags = 0
+        # for info on the specs, see: http://id3.org/Developer%20Information
+        header = self._read_file_header(fh, 10)
+        # check if there is an ID3v2 tag at the beginning of the file
+        if header.startswith(b'ID3'):
+            major = header[3]
+            if _DEBUG:
+                print(f'Found id3 v2.{major}')
+            flags = header[5]
+            size = self._unsynchsafe(header[6:10])
+        self._bytepos_after_id3v2 = size
+        return size, flags, major
+
+    def _parse_id3v2(self, fh: BinaryIO) -> None:
+        size, flags, major = self._parse_id3v2_header(fh)
+        if size <= 0:
+            return
+        # read the whole tag at once, and walk the frames in memory
+        tag_offset: int | None = fh.tell()
+        data = fh.read(size)
+        tag_unsynchronised = bool(flags & 0x80)
+        if tag_unsynchronised and major < 4:
+            # ID3 v2.2/2.3 apply unsynchronisation to the whole tag
+            data = self._remove_unsynchronisation(data)
+            tag_offset = None  # positions no longer match the file
+        view = memoryview(data)
+        data_len = len(data)
+        pos = 0
+        if flags & 0x40:  # just read over the extended header.
+            if major == 4:  # size includes itself
+                pos = self._unsynchsafe(view[:4])
+            else:
+                pos = _UINT32_BE.unpack_from(view)[0] + 4
+        header_len = 6 if major == 2 else 10
+        id_len = 3 if major == 2 else 4
+        while pos + header_len <= data_len:
+            frame_id = bytes(view[pos:pos + id_len])
+            if frame_id in self._EMPTY_FRAME_IDS:
+                break  # padding
+            frame_flags = 0
+            frame_size: int
+            if major == 2:  # ID3v2.2 especially ugly
+                frame_size = _UINT32_BE.unpack_from(
+                    view, pos + 2)[0] & 0xFFFFFF
+            elif major == 4:
+                frame_size = self._unsynchsafe(view[pos + 4:pos + 8])
+                frame_flags = view[pos + 9]
+            else:
+                frame_size = _UINT32_BE.unpack_from(view, pos + 4)[0]
+                frame_flags = view[pos + 9]
+            content_start = pos + header_len
+            pos = content_start + frame_size
+            if _DEBUG:
+                print(f'Found id3 Frame {frame_id!r} at '
+                      f'{content_start}-{pos} of {size}')
+            if frame_size > size:
+                break  # invalid frame size, stop here
+            if not self._is_frame_wanted(frame_id):
+                continue
+            content_offset = (
+                None if tag_offset is None else tag_offset + content_start)
+            content, content_offset = self._decode_frame_content(
+                data[content_start:pos], content_offset, major, frame_flags,
+                tag_unsynchronised)
+            if content:
+                self._parse_frame(frame_id, content, content_offset)
+        self._set_grouping_work_fields()
+
+    def _is_frame_wanted(self, frame_id: bytes) -> bool:
+        if frame_id in self._IMAGE_FRAME_IDS:
+            return self._load_image
+        if not self._parse_tags:
+            return False
+        fieldname = self._ID3_MAPPING.get(frame_id)
+        if fieldname is None:
+            if frame_id in self._IGNORED_FRAME_IDS:
+                return False
+            if self._fields is None or frame_id in self._CUSTOM_FRAME_IDS:
+                return True  # custom field names are stored in the frame
+            if frame_id in self._SYNCED_LYRICS_FRAME_IDS:
+                fieldname = 'other.lyrics'
+            else:
+                fieldname = (
+                    self._OTHER_PREFIX + frame_id.decode('latin-1').lower())
+        elif self._fields is None or fieldname == 'comment':
+            return True  # comments can contain custom fields
+        elif fieldname in self._GROUPING_FIELD_NAMES:
+            return any(self._is_field_wanted(name)
+                       for name in self._GROUPING_FIELD_NAMES[fieldname])
+        return fieldname in self._fields
+
+    def _decode_frame_content(
+        self,
+        content: bytes,
+        content_offset: int | None,
+        major: int,
+        flags: int,
+        tag_unsynchronised: bool
+    ) -> tuple[bytes, int | None]:
+        # Remove the extra data of frame format flags, and return the actual
+        # frame content, and its file position if unmodified.
+        # http://id3.org/id3v2.3.0#Frame_header_flags
+        # http://id3.org/id3v2.4.0-structure (section 4.1.2)
+        if major == 3:
+            compressed, encrypted, grouped = (
+                flags & 0x80, flags & 0x40, flags & 0x20)
+            prefix_len = (4 if compressed else 0) + (
+                1 if encrypted else 0) + (1 if grouped else 0)
+            unsynchronised = False
+        elif major == 4:
+            grouped, compressed, encrypted = (
+                flags & 0x40, flags & 0x08, flags & 0x04)
+            unsynchronised = bool(flags & 0x02) or tag_unsynchronised
+            prefix_len = (1 if grouped else 0) + (1 if encrypted else 0) + (
+                4 if flags & 0x01 else 0)  # data length indicator
+        else:
+            return content, content_offset
+        if encrypted:
+            return b'', None
+        content = content[prefix_len:]
+        if content_offset is not None:
+            content_offset += prefix_len
+        if unsynchronised:
+            content = self._remove_unsynchronisation(content)
+            content_offset = None
+        if compressed:
+            # pylint: disable=import-outside-toplevel
+            from zlib import decompress, error as zlib_error
+            try:
+                content = decompress(content)
+            except zlib_error:
+                return b'', None
+            content_offset = None
+        return content, content_offset
+
+    @staticmethod
+    def _remove_unsynchronisation(data: bytes) -> bytes:
+        return data.replace(b'\xff\x00', b'\xff')
+
+    def _parse_id3v1(self, fh: BinaryIO) -> None:
+        content = fh.read(3 + 30 + 30 + 30 + 4 + 30 + 1)
+        if content[:3] != b'TAG':  # check if this is an ID3 v1 tag
+            return
+
+        def asciidecode(x: bytes) -> str:
+            return self._unpad(
+                x.decode(self._default_encoding or 'latin1', 'replace'))
+        # Only set fields that were not set by ID3v2 tags, as ID3v1
+        # tags are more likely to be outdated or have encoding issues
+        if not self.title:
+            value = asciidecode(content[3:33])
+            if value:
+                self._set_field('title', value)
+        if not self.artist:
+            value = asciidecode(content[33:63])
+            if value:
+                self._set_field('artist', value)
+        if not self.album:
+            value = asciidecode(content[63:93])
+            if value:
+                self._set_field('album', value)
+        if not self.year:
+            value = asciidecode(content[93:97])
+            if value:
+                self._set_field('year', value)
+        comment = content[97:127]
+        if b'\x00\x00' < comment[-2:] < b'\x01\x00':
+            if self.track is None:
+                self._set_field('track', ord(comment[-1:]))
+            comment = comment[:-2]
+        if not self.comment:
+            value = asciidecode(comment)
+            if value:
+                self._set_field('comment', value)
+        if not self.genre:
+            genre_id = ord(content[127:128])
+            if genre_id < len(self._ID3V1_GENRES):
+                self._set_field('genre', self._ID3V1_GENRES[genre_id])
+
+    def _parse_custom_field(self, content: str) -> bool:
+        custom_field_name, separator, value = content.partition('\x00')
+        custom_field_name_lower = custom_field_name.lower()
+        value = value.lstrip('\ufeff')
+        if custom_field_name_lower and separator and value:
+            field_name = self._ID3_MAPPING_CUSTOM.get(
+                custom_field_name_lower,
+                self._OTHER_PREFIX + custom_field_name_lower)
+            self._set_field(field_name, value)
+            return True
+        return False
+
+    def _set_grouping_work_fields(self) -> None:
+        # iTunes 12.5.4.42 added a new GRP1 frame for 'grouping', and
+        # repurposed the TIT1 frame for 'work'. Handle this mess here.
+        if self._modern_grouping_values:
+            for value in self._modern_grouping_values:
+                self._set_field('other.grouping', value)
+            for value in self._legacy_grouping_values:
+                self._set_field('other.work', value)
+            return
+        for value in self._legacy_grouping_values:
+            self._set_field('other.grouping', value)
+
+    @classmethod
+    def _create_tag_image(cls,
+                          data: bytes,
+                          pic_type: int,
+                          mime_type: str | None = None,
+                          description: str | None = None) -> tuple[str, Image]:
+        field_name = cls._UNKNOWN_IMAGE_TYPE
+        if 0 <= pic_type <= len(cls._IMAGE_TYPES):
+            field_name = cls._IMAGE_TYPES[pic_type]
+        name = field_name
+        if field_name.startswith(cls._OTHER_PREFIX):
+            name = field_name[len(cls._OTHER_PREFIX):]
+        image = Image(name, data)
+        if mime_type:
+            image.mime_type = mime_type
+        if description:
+            image.description = description
+        return field_name, image
+
+    def _parse_image(self,
+                     frame_id: bytes,
+                     content: bytes) -> tuple[str, Image]:
+        # See section 4.14: http://id3.org/id3v2.4.0-frames
+        encoding = content[:1]
+        if frame_id == b'PIC':  # ID3 v2.2:
+            imgformat = content[1:4].lower()
+            mime_type = self._ID3V2_2_IMAGE_FORMATS.get(imgformat)
+            # skip encoding (1), imgformat (3), pictype(1)
+            desc_start_pos = 5
+        else:  # ID3 v2.3+
+            mime_start_pos = 1
+            mime_end_pos = self._find_string_end_pos(
+                content, start_pos=mime_start_pos)
+            mime_type = self._decode_string(
+                content[mime_start_pos:mime_end_pos]).lower()
+            # skip mtype, pictype(1)
+            desc_start_pos = mime_end_pos + 1
+        pic_type = content[desc_start_pos - 1]
+        desc_end_pos = self._find_string_end_pos(
+            content, encoding, desc_start_pos)
+        # skip stray null byte in broken file
+        if (desc_end_pos + 1 < len(content)
+                and content[desc_end_pos] == 0
+                and content[desc_end_pos + 1] != 0):
+            desc_end_pos += 1
+        desc = self._decode_string(
+            encoding + content[desc_start_pos:desc_end_pos])
+        return self._create_tag_image(
+            content[desc_end_pos:], pic_type, mime_type, desc)
+
+    @staticmethod
+    def _lrc_timestamp(seconds: float) -> str:
+        cs = int(seconds * 100)
+        minutes, cs = divmod(cs, 6000)
+        seconds, cs = divmod(cs, 100)
+        return f"{minutes:02d}:{seconds:02d}.{cs:02d}"
+
+    def _parse_synced_lyrics(self, content: bytes) -> str:
+        # Convert ID3 synced lyrics to LRC format
+        content_length = len(content)
+        encoding = content[:1]
+        # skip language (3)
+        timestamp_format = content[4:5]
+        # skip content type (1)
+        start_pos = 6
+        end_pos = self._find_string_end_pos(content, encoding, start_pos)
+        lines = []
+        offset = end_pos
+        while offset < content_length:
+            end_pos = self._find_string_end_pos(content, encoding, offset)
+            if end_pos <= offset:  # missing terminator
+                break
+            value = self._decode_string(
+                encoding + content[offset:end_pos]).lstrip('\n')
+            offset = end_pos
+            time = _UINT32_BE.unpack_from(content, offset)[0]
+            offset += 4
+            if timestamp_format == b'\x02':
+                # time in milliseconds
+                timestamp = self._lrc_timestamp(time / 1000)
+                lines.append(f'[{timestamp}]{value}')
+            else:
+                lines.append(value)
+        return '\n'.join(lines)
+
+    def _parse_frame(self,
+                     frame_id: bytes,
+                     content: bytes,
+                     content_offset: int | None = None) -> None:
+        should_set_field = True
+        if self._parse_tags and frame_id in self._ID3_MAPPING:
+            fieldname = self._ID3_MAPPING[frame_id]
+            language = fieldname in {'comment', 'other.lyrics'}
+            value = self._decode_string(content, language)
+            if not value:
+                return
+            if fieldname == "comment":
+                # check if comment is a key-value pair (used by iTunes)
+                should_set_field = not self._parse_custom_field(value)
+            elif fieldname in {'track', 'disc', 'other.movement'}:
+                if '/' in value:
+                    value, total = value.split('/')[:2]
+                    if total.isdecimal():
+                        self._set_field(f'{fieldname}_total', int(total))
+                if value.isdecimal():
+                    self._set_field(fieldname, int(value))
+                should_set_field = False
+            elif fieldname == 'genre':
+                genre_id = 255
+                # funky: id3v1 genre hidden in a id3v2 field
+                if value.isdecimal():
+                    genre_id = int(value)
+                # funkier: the TCO may contain genres in parens, e.g '(13)'
+                elif value.startswith('('):
+                    end_pos = value.find(')')
+                    parens_text = value[1:end_pos]
+                    if end_pos > 0 and parens_text.isdecimal():
+                        genre_id = int(parens_text)
+                if 0 <= genre_id < len(self._ID3V1_GENRES):
+                    value = self._ID3V1_GENRES[genre_id]
+            elif fieldname == 'modern_grouping':
+                self._modern_grouping_values.append(value)
+                should_set_field = False
+            elif fieldname == 'legacy_grouping':
+                self._legacy_grouping_values.append(value)
+                should_set_field = False
+            if should_set_field:
+                self._set_field(fieldname, value)
+        elif self._parse_tags and frame_id in self._SYNCED_LYRICS_FRAME_IDS:
+            lyrics = self._parse_synced_lyrics(content)
+            self._set_field('other.lyrics', lyrics)
+        elif self._parse_tags and frame_id in self._CUSTOM_FRAME_IDS:
+            # custom fields
+            value = self._decode_string(content)
+            if value:
+                self._parse_custom_field(value)
+        elif self._parse_tags and frame_id not in self._IGNORED_FRAME_IDS:
+            # unknown, try to add to other dict
+            value = self._decode_string(content)
+            if value:
+                self._set_field(
+                    self._OTHER_PREFIX + frame_id.decode('latin-1').lower(),
+                    value)
+        elif self._load_image and frame_id in self._IMAGE_FRAME_IDS:
+            field_name, image = self._parse_image(frame_id, content)
+            if self._image_source is not None and content_offset is not None:
+                # image data is at the end of the frame
+                # pylint: disable=protected-access
+                image._set_file_range(
+                    self._image_source,
+                    content_offset + len(content) - image.size, image.size)
+            # pylint: disable=protected-access
+            self.images._set_field(field_name, image)
+
+    @staticmethod
+    def _find_string_end_pos(content: bytes,
+                             encoding: bytes = b'\x00',
+                             start_pos: int = 0) -> int:
+        # latin1 and utf-8 are 1 byte
+        if encoding in {b'\x00', b'\x03'}:
+            return content.find(b'\x00', start_pos) + 1
+        # utf-16 terminators are two null bytes at an even offset
+        end_pos = content.find(b'\x00\x00', start_pos)
+        while end_pos != -1 and (end_pos - start_pos) % 2:
+            end_pos = content.find(b'\x00\x00', end_pos + 1)
+        return end_pos + 2 if end_pos != -1 else 0
+
+    def _decode_string(self, value: bytes, language: bool = False) -> str:
+        default_encoding = 'ISO-8859-1'
+        if self._default_encoding:
+            default_encoding = self._default_encoding
+        # it's not my fault, this is the spec.
+        first_byte = value[:1]
+        if first_byte == b'\x00':  # ISO-8859-1
+            value = value[1:]
+            encoding = default_encoding
+        elif first_byte == b'\x01':  # UTF-16 with BOM
+            value = value[1:]
+            # remove language (but leave BOM)
+            if language:
+                if value[3:5] in {b'\xfe\xff', b'\xff\xfe'}:
+                    value = value[3:]
+                if value[:3].isalpha():
+                    value = value[3:]  # remove language
+                # strip optional additional null bytes
+                value = value.lstrip(b'\x00')
+            # read byte order mark to determine endianness
+            encoding = ('UTF-16be' if value.startswith(b'\xfe\xff')
+                        else 'UTF-16le')
+            # strip the bom if it exists
+            if value.startswith(b'\xfe\xff') or value.startswith(b'\xff\xfe'):
+                value = value[2:] if len(value) % 2 == 0 else value[2:-1]
+            # remove ADDITIONAL OTHER BOM :facepalm:
+            if value.startswith(b'\x00\x00\xff\xfe'):
+                value = value[4:]
+        elif first_byte == b'\x02':  # UTF-16 without BOM
+            # strip optional null byte, if byte count uneven
+            value = value[1:-1] if len(value) % 2 == 0 else value[1:]
+            encoding = 'UTF-16be'
+        elif first_byte == b'\x03':  # UTF-8
+            value = value[1:]
+            encoding = 'UTF-8'
+        else:
+            encoding = default_encoding  # wild guess
+        if language and value[:3].isalpha():
+            value = value[3:]  # remove language
+        return self._unpad(value.decode(encoding, 'replace'))
+
+    @staticmethod
+    def _unsynchsafe(ints: Sequence[int]) -> int:
+        return (ints[0] << 21) + (ints[1] << 14) + (ints[2] << 7) + ints[3]
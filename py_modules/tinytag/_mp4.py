@@ -0,0 +1,588 @@
+# SPDX-FileCopyrightText: 2014-2025 tinytag Contributors
+# SPDX-License-Identifier: MIT
+
+"""MP4 audio parser."""
+
+from __future__ import annotations
+from io import BytesIO
+from os import SEEK_CUR
+from struct import Struct, calcsize, unpack_from
+from threading import Lock
+
+from .tinytag import (
+    _DEBUG, _UINT16_BE, _UINT32_BE, _UINT64_BE, Image, TinyTag)
+
+TYPE_CHECKING = False
+
+# Lazy imports for type checking
+if TYPE_CHECKING:
+    from collections.abc import Callable  # pylint: disable-all
+    from typing import Any, BinaryIO, Dict, Union
+
+    _DataTreeDict = Dict[
+        bytes, Union['_DataTreeDict', Callable[..., Dict[str, Any]]]]
+else:
+    _DataTreeDict = dict
+
+
+class _MP4(TinyTag):
+    """MP4 Audio Parser.
+
+    https://developer.apple.com/library/mac/documentation/QuickTime/QTFF/Metadata/Metadata.html
+    https://developer.apple.com/library/mac/documentation/QuickTime/QTFF/QTFFChap2/qtff2.html
+    """
+
+    _READS_FILE_HEADER = True
+
+    _CUSTOM_FIELD_NAME_MAPPING = {
+        'artists': 'artist',
+        'conductor': 'other.conductor',
+        'discsubtitle': 'other.set_subtitle',
+        'initialkey': 'other.initial_key',
+        'isrc': 'other.isrc',
+        'language': 'other.language',
+        'lyricist': 'other.lyricist',
+        'media': 'other.media',
+        'website': 'other.url',
+        'license': 'other.license',
+        'barcode': 'other.barcode',
+        'catalognumber': 'other.catalog_number',
+    }
+    _IMAGE_MIME_TYPES = {
+        13: 'image/jpeg',
+        14: 'image/png'
+    }
+    _ILST_MAPPING = {
+        # http://atomicparsley.sourceforge.net/mpeg-4files.html
+        # https://metacpan.org/dist/Image-ExifTool/source/lib/Image/ExifTool/QuickTime.pm#L3093
+        b'\xa9ART': 'artist',
+        b'\xa9alb': 'album',
+        b'\xa9cmt': 'comment',
+        b'\xa9com': 'composer',
+        b'\xa9con': 'other.conductor',
+        b'\xa9day': 'year',
+        b'\xa9des': 'other.description',
+        b'\xa9dir': 'other.director',
+        b'\xa9gen': 'genre',
+        b'\xa9grp': 'other.grouping',
+        b'\xa9lyr': 'other.lyrics',
+        b'\xa9mvc': 'other.movement_total',
+        b'\xa9mvi': 'other.movement',
+        b'\xa9mvn': 'other.movement_name',
+        b'\xa9nam': 'title',
+        b'\xa9pub': 'other.publisher',
+        b'\xa9too': 'other.encoded_by',
+        b'\xa9wrk': 'other.work',
+        b'\xa9wrt': 'composer',
+        b'aART': 'albumartist',
+        b'cprt': 'other.copyright',
+        b'desc': 'other.description',
+        b'shwm': 'other.show_movement',
+        b'tmpo': 'other.bpm',
+    }
+    _ILST_FIELD_NAMES = {
+        # atoms which are not parsed as a single data field
+        b'disk': 'disc',
+        b'trkn': 'track',
+        b'gnre': 'genre',
+    }
+    _UNPACK_FORMATS = {
+        1: Struct('>b'),
+        2: Struct('>h'),
+        4: Struct('>i'),
+        8: Struct('>q')
+    }
+    _VERSIONED_ATOMS = {b'meta', b'stsd'}  # those have an extra 4 byte header
+    _FLAGGED_ATOMS = {b'stsd'}  # these also have an extra 4 byte header
+    _ATOM_HEADER = Struct('>I4s')
+    _NUMBER_TOTAL = Struct('>2xHH')  # trkn and disk data after the header
+    _UINT32_PAIR = Struct('>II')
+    _UINT32_UINT64 = Struct('>IQ')
+    # The ilst node holds metadata items, which are parsed as a whole
+    _ILST_NODE: _DataTreeDict = {}
+
+    # the chapter text of QuickTime chapter tracks is stored in samples
+    _SAMPLE_TABLE_ATOMS = {b'stts', b'stsz', b'stsc', b'stco', b'co64'}
+    _CHAPTER_HANDLERS = {b'text', b'sbtl'}
+
+    # parser trees for each combination of (tags, duration, chapters)
+    _data_trees: dict[tuple[bool, bool, bool], _DataTreeDict] = {}
+    # remember where the moov atom is, to seek there when parsing a file again
+    _moov_offsets: dict[tuple[str, int], int] = {}
+    # files may be parsed from several threads at once
+    _moov_offsets_lock = Lock()
+    _MOOV_OFFSETS_MAX_SIZE = 256
+
+    def __init__(self) -> None:
+        super().__init__()
+        # sample tables and references of the tracks, to find chapters
+        self._tracks: list[dict[str, Any]] = []
+
+    @classmethod
+    def _data_tree(cls,
+                   tags: bool,
+                   duration: bool,
+                   chapters: bool) -> _DataTreeDict:
+        # The parser trees: Each key is an atom name which is traversed if
+        # existing. Leaves of the parser tree are callables which receive
+        # the atom data. Callables return {fieldname: value} which is updates
+        # the TinyTag. All trees only contain the moov atom at the top level.
+        # https://developer.apple.com/library/mac/documentation/QuickTime/QTFF/QTFFChap3/qtff3.html
+        key = (tags, duration, chapters)
+        tree = cls._data_trees.get(key)
+        if tree is not None:
+            return tree
+        moov: _DataTreeDict = {}
+        if duration:
+            moov = cls._merge_trees(moov, {
+                b'mvhd': cls._parse_mvhd,
+                b'trak': {b'mdia': {b"minf": {b"stbl": {b"stsd": {
+                    b'mp4a': cls._parse_audio_sample_entry_mp4a,
+                    b'alac': cls._parse_audio_sample_entry_alac
+                }}}}}
+            })
+        if tags:
+            moov = cls._merge_trees(moov, {
+                b'udta': {b'meta': {b'ilst': cls._ILST_NODE}}})
+        if chapters:
+            moov = cls._merge_trees(moov, {
+                b'udta': {b'chpl': cls._parse_chpl},
+                b'trak': {
+                    b'tkhd': cls._parse_tkhd,
+                    b'tref': {b'chap': cls._parse_chap},
+                    b'mdia': {
+                        b'mdhd': cls._parse_mdhd,
+                        b'hdlr': cls._parse_hdlr,
+                        b'minf': {b'stbl': {
+                            b'stts': cls._parse_stts,
+                            b'stsz': cls._parse_stsz,
+                            b'stsc': cls._parse_stsc,
+                            b'stco': cls._parse_stco,
+                            b'co64': cls._parse_co64,
+                        }}
+                    }
+                }
+            })
+        tree = cls._data_trees[key] = {b'moov': moov}
+        return tree
+
+    @classmethod
+    def _merge_trees(cls,
+                     tree: _DataTreeDict,
+                     other: _DataTreeDict) -> _DataTreeDict:
+        merged = dict(tree)
+        for atom_type, sub_tree in other.items():
+            existing = merged.get(atom_type)
+            if (isinstance(existing, dict) and isinstance(sub_tree, dict)
+                    and existing is not cls._ILST_NODE):
+                merged[atom_type] = cls._merge_trees(existing, sub_tree)
+            else:
+                merged[atom_type] = sub_tree
+        return merged
+
+    def _determine_duration(self, fh: BinaryIO) -> None:
+        if self._tags_parsed:
+            return  # already parsed together with the tags
+        self._traverse_atoms(fh, self._data_tree(False, True, False))
+
+    def _parse_tag(self, fh: BinaryIO) -> None:
+        # collect tags and duration in a single pass over the moov atom
+        tree = self._data_tree(
+            True, self._parse_duration, self._load_chapters)
+        self._traverse_atoms(fh, tree)
+        self._tags_parsed = True
+        if self._load_chapters and not self._chapters:
+            self._parse_chapter_track(fh)
+
+    def _traverse_atoms(self, fh: BinaryIO, tree: _DataTreeDict) -> None:
+        # Containers we descended into are kept on a stack, together with
+        # the end position of their parent
+        stack: list[tuple[_DataTreeDict, int]] = []
+        node = tree
+        end_pos = self.filesize
+        pos = 0
+        header_len = 8
+        atom_header = b''
+        cache_key = None
+        if self.filename:
+            cache_key = (self.filename, self.filesize)
+            with self._moov_offsets_lock:
+                moov_offset = self._moov_offsets.get(cache_key)
+            if moov_offset is not None:
+                self._file_header = b''
+                fh.seek(moov_offset)
+                atom_header = fh.read(header_len)
+                if atom_header[4:] == b'moov':
+                    pos = moov_offset
+                else:  # file has changed
+                    atom_header = b''
+                    fh.seek(0)
+        if not atom_header:
+            atom_header = self._read_file_header(fh, header_len)
+        while len(atom_header) == header_len:
+            atom_size, atom_type = self._ATOM_HEADER.unpack(atom_header)
+            if (atom_type == b'moov' and not stack
+                    and cache_key is not None):
+                offsets = self._moov_offsets
+                with self._moov_offsets_lock:
+                    if len(offsets) >= self._MOOV_OFFSETS_MAX_SIZE:
+                        offsets.pop(next(iter(offsets)), None)
+                    offsets[cache_key] = pos
+            data_pos = pos + header_len
+            if atom_size == 1:  # 64-bit size
+                ext_size_header = fh.read(8)
+                if len(ext_size_header) != 8:
+                    break
+                atom_size = _UINT64_BE.unpack(ext_size_header)[0]
+                data_pos += 8
+            # treat invalid sizes (including zero) as empty atoms
+            atom_end_pos = max(pos + atom_size, data_pos)
+            if _DEBUG:
+                print(f'{" " * 4 * len(stack)} pos: {pos} '
+                      f'atom: {atom_type!r} len: {atom_end_pos - pos}')
+            sub_tree = node.get(atom_type)
+            if node is self._ILST_NODE:
+                if self._is_ilst_atom_wanted(atom_type):
+                    self._parse_ilst_item(
+                        fh, atom_type, data_pos, atom_end_pos)
+                fh.seek(atom_end_pos)
+            elif sub_tree is not None:
+                if atom_type in self._VERSIONED_ATOMS:  # jump atom version
+                    data_pos += 4
+                if atom_type in self._FLAGGED_ATOMS:  # jump atom flags
+                    data_pos += 4
+                fh.seek(data_pos)
+                # if the tree node is a dict, traverse deeper into the tree
+                if isinstance(sub_tree, dict):
+                    if atom_type == b'trak':
+                        self._tracks.append({})
+                    stack.append((node, end_pos))
+                    node = sub_tree
+                    end_pos = atom_end_pos
+                    atom_end_pos = data_pos
+                # if the tree node is a callable, call it on the atom data
+                elif (atom_type in self._SAMPLE_TABLE_ATOMS
+                        and self._tracks[-1].get('handler')
+                        not in self._CHAPTER_HANDLERS):
+                    fh.seek(atom_end_pos)  # only needed for chapter tracks
+                else:
+                    atom_data = fh.read(atom_end_pos - data_pos)
+                    for fieldname, value in sub_tree(atom_data).items():
+                        if fieldname.startswith('track.'):
+                            self._tracks[-1][fieldname[6:]] = value
+                        elif fieldname == 'chapters':
+                            self._chapters = value
+                        else:
+                            self._set_field(fieldname, value)
+            else:  # if no action was specified, jump over atom
+                fh.seek(atom_end_pos)
+            pos = atom_end_pos
+            # return to parent nodes if we have reached the end of a branch
+            while stack and pos + header_len > end_pos:
+                pos = end_pos
+                node, end_pos = stack.pop()
+                if not stack:
+                    return  # done with the moov atom, nothing else to parse
+                fh.seek(pos)
+            atom_header = fh.read(header_len)  # read next atom
+
+    def _ilst_field_name(self, atom_type: bytes) -> str:
+        return (self._ILST_MAPPING.get(atom_type)
+                or self._ILST_FIELD_NAMES.get(atom_type)
+                or self._OTHER_PREFIX + atom_type.decode('latin-1').lower())
+
+    def _is_ilst_atom_wanted(self, atom_type: bytes) -> bool:
+        if atom_type == b'covr':
+            return self._load_image
+        if self._fields is None or atom_type == b'----':
+            return True  # custom field names are stored in the atom
+        return self._ilst_field_name(atom_type) in self._fields
+
+    def _parse_ilst_item(self,
+                         fh: BinaryIO,
+                         atom_type: bytes,
+                         data_pos: int,
+                         end_pos: int) -> None:
+        # http://atomicparsley.sourceforge.net/mpeg-4files.html
+        if atom_type == b'covr' and self._image_source is not None:
+            self._parse_lazy_cover_images(fh, data_pos, end_pos)
+            return
+        item = fh.read(end_pos - data_pos)
+        fieldname = None
+        if atom_type != b'----':  # custom fields have a name atom
+            fieldname = self._ilst_field_name(atom_type)
+        item_len = len(item)
+        pos = 0
+        while pos + 8 <= item_len:
+            atom_size, sub_atom_type = self._ATOM_HEADER.unpack_from(
+                item, pos)
+            if atom_size < 8:
+                break
+            sub_atom_end = pos + atom_size
+            if sub_atom_type == b'data' and fieldname is not None:
+                self._parse_data_atom(
+                    atom_type, fieldname, item[pos + 8:sub_atom_end])
+            elif sub_atom_type == b'name' and atom_type == b'----':
+                name = item[pos + 12:sub_atom_end].decode(
+                    'utf-8', 'replace').lower()
+                fieldname = self._CUSTOM_FIELD_NAME_MAPPING.get(
+                    name, self._OTHER_PREFIX + name)
+                if not self._is_field_wanted(fieldname):
+                    return
+            pos = sub_atom_end
+
+    def _parse_data_atom(self,
+                         atom_type: bytes,
+                         fieldname: str,
+                         data_atom: bytes) -> None:
+        data_type = _UINT32_BE.unpack_from(data_atom)[0]
+        if atom_type == b'covr':
+            image = Image('front_cover', data_atom[8:],
+                          self._IMAGE_MIME_TYPES.get(data_type))
+            # pylint: disable=protected-access
+            self.images._set_field('front_cover', image)
+        elif atom_type in {b'disk', b'trkn'}:
+            # for some reason the first number is always irrelevant.
+            number, total = self._NUMBER_TOTAL.unpack_from(
+                data_atom, 8)
+            self._set_field(fieldname, number)
+            self._set_field(f'{fieldname}_total', total)
+        elif atom_type == b'gnre':
+            # dunno why genre is offset by -1 but that's how mutagen does it
+            # the genre table is only needed for this rare atom, import lazily
+            # pylint: disable=import-outside-toplevel,protected-access
+            from ._id3 import _ID3
+            idx = _UINT16_BE.unpack_from(data_atom, 8)[0] - 1
+            if idx < len(_ID3._ID3V1_GENRES):
+                self._set_field('genre', _ID3._ID3V1_GENRES[idx])
+        else:
+            value = None
+            data = data_atom[8:]
+            if data_type == 1:     # UTF-8 string
+                value = data.decode('utf-8', 'replace')
+            elif data_type == 21:  # BE signed integer
+                fmts = self._UNPACK_FORMATS
+                data_len = len(data)
+                if data_len in fmts:
+                    value = str(fmts[data_len].unpack(data)[0])
+            if value:
+                self._set_field(fieldname, value)
+
+    def _parse_lazy_cover_images(self,
+                                 fh: BinaryIO,
+                                 pos: int,
+                                 end_pos: int) -> None:
+        # only read the data type, the image is read when needed
+        header_len = 16
+        while pos + header_len <= end_pos:
+            fh.seek(pos)
+            header = fh.read(header_len)
+            if len(header) != header_len:
+                break
+            atom_size, atom_type = self._ATOM_HEADER.unpack_from(header)
+            if atom_size < header_len:
+                break
+            if atom_type == b'data':
+                data_type = _UINT32_BE.unpack_from(header, 8)[0]
+                image = Image('front_cover', b'',
+                              self._IMAGE_MIME_TYPES.get(data_type))
+                # the file may end before the atom does
+                size = min(atom_size, self.filesize - pos) - header_len
+                # pylint: disable=protected-access
+                image._set_file_range(
+                    self._image_source, pos + header_len, max(size, 0))
+                self.images._set_field('front_cover', image)
+            pos += atom_size
+
+    @classmethod
+    def _read_extended_descriptor(cls, esds_atom: BinaryIO) -> None:
+        for _i in range(4):
+            if esds_atom.read(1) != b'\x80':
+                break
+
+    @classmethod
+    def _parse_audio_sample_entry_mp4a(cls, data: bytes) -> dict[str, int]:
+        # this atom also contains the esds atom:
+        # https://ffmpeg.org/doxygen/0.6/mov_8c-source.html
+        # http://xhelmboyx.tripod.com/formats/mp4-layout.txt
+        # http://sasperger.tistory.com/103
+
+        # jump over version and flags
+        channels = _UINT16_BE.unpack_from(data, 16)[0]
+        # jump over bit_depth, QT compr id & pkt size
+        sr = _UINT32_BE.unpack_from(data, 22)[0]
+
+        # ES Description Atom
+        esds_atom_size = _UINT32_BE.unpack_from(data, 28)[0]
+        esds_atom = BytesIO(data[36:36 + esds_atom_size])
+        esds_atom.seek(5, SEEK_CUR)   # jump over version, flags and tag
+
+        # ES Descriptor
+        cls._read_extended_descriptor(esds_atom)
+        esds_atom.seek(4, SEEK_CUR)   # jump over ES id, flags and tag
+
+        # Decoder Config Descriptor
+        cls._read_extended_descriptor(esds_atom)
+        esds_atom.seek(9, SEEK_CUR)
+        avg_br = _UINT32_BE.unpack(esds_atom.read(4))[0] / 1000  # kbit/s
+        return {'channels': channels, 'samplerate': sr, 'bitrate': avg_br}
+
+    @classmethod
+    def _parse_audio_sample_entry_alac(cls, data: bytes) -> dict[str, int]:
+        # https://github.com/macosforge/alac/blob/master/ALACMagicCookieDescription.txt
+        bitdepth = data[45]
+        channels = data[49]
+        avg_br, sr = cls._UINT32_PAIR.unpack_from(data, 56)
+        avg_br /= 1000  # kbit/s
+        return {'channels': channels, 'samplerate': sr, 'bitrate': avg_br,
+                'bitdepth': bitdepth}
+
+    @classmethod
+    def _parse_mvhd(cls, data: bytes) -> dict[str, float]:
+        # http://stackoverflow.com/a/3639993/1191373
+        version = data[0]
+        # jump over flags, create & mod times
+        if version == 0:  # uses 32 bit integers for timestamps
+            time_scale, duration = cls._UINT32_PAIR.unpack_from(data, 12)
+        else:  # version == 1:  # uses 64-bit integers for timestamps
+            time_scale, duration = cls._UINT32_UINT64.unpack_from(
+                data, 20)
+        return {'duration': duration / time_scale}
+
+    @classmethod
+    def _parse_chpl(cls, data: bytes) -> dict[str, list[tuple[float, str]]]:
+        # Nero chapters: start times in 100 ns units and UTF-8 titles
+        # https://github.com/FFmpeg/FFmpeg/blob/master/libavformat/mov.c
+        pos = 8 if data[:1] == b'\x01' else 4  # version 1 has 4 more bytes
+        if pos >= len(data):
+            return {}
+        count = data[pos]
+        pos += 1
+        chapters = []
+        data_len = len(data)
+        for _i in range(count):
+            if pos + 9 > data_len:
+                break
+            start = _UINT64_BE.unpack_from(data, pos)[0]
+            title_end = pos + 9 + data[pos + 8]
+            title = data[pos + 9:title_end].decode('utf-8', 'replace')
+            chapters.append((start / 10_000_000, title))
+            pos = title_end
+        return {'chapters': chapters}
+
+    @classmethod
+    def _parse_tkhd(cls, data: bytes) -> dict[str, int]:
+        # the track id follows the creation and modification times
+        offset = 20 if data[:1] == b'\x01' else 12
+        if len(data) < offset + 4:
+            return {}
+        return {'track.id': _UINT32_BE.unpack_from(data, offset)[0]}
+
+    @classmethod
+    def _parse_chap(cls, data: bytes) -> dict[str, tuple[int, ...]]:
+        return {'track.chapter_ids': unpack_from(
+            f'>{len(data) // 4}I', data)}
+
+    @classmethod
+    def _parse_mdhd(cls, data: bytes) -> dict[str, int]:
+        offset = 20 if data[:1] == b'\x01' else 12
+        if len(data) < offset + 4:
+            return {}
+        return {'track.timescale': _UINT32_BE.unpack_from(data, offset)[0]}
+
+    @classmethod
+    def _parse_hdlr(cls, data: bytes) -> dict[str, bytes]:
+        return {'track.handler': data[8:12]}
+
+    @classmethod
+    def _unpack_table(cls,
+                      data: bytes,
+                      item_format: str,
+                      offset: int = 4) -> tuple[int, ...]:
+        # tables start with their entry count, after version and flags
+        if len(data) < offset + 4:
+            return ()
+        count = _UINT32_BE.unpack_from(data, offset)[0]
+        item_size = calcsize(f'>{item_format}')
+        count = min(count, (len(data) - offset - 4) // item_size)
+        return unpack_from(f'>{item_format * count}', data, offset + 4)
+
+    @classmethod
+    def _parse_stts(cls, data: bytes) -> dict[str, tuple[int, ...]]:
+        # (sample count, sample duration) pairs
+        return {'track.time_to_sample': cls._unpack_table(data, 'II')}
+
+    @classmethod
+    def _parse_stsz(cls, data: bytes) -> dict[str, tuple[int, ...]]:
+        # a sample size of zero means that each sample size is listed
+        if len(data) < 12:
+            return {}
+        sample_size, sample_count = cls._UINT32_PAIR.unpack_from(data, 4)
+        if sample_size:  # limit the count of malformed tables
+            return {'track.sample_sizes': (sample_size,) * min(
+                sample_count, 65536)}
+        return {'track.sample_sizes': cls._unpack_table(data, 'I', 8)}
+
+    @classmethod
+    def _parse_stsc(cls, data: bytes) -> dict[str, tuple[int, ...]]:
+        # (first chunk, samples per chunk, sample description) entries
+        return {'track.sample_to_chunk': cls._unpack_table(data, 'III')}
+
+    @classmethod
+    def _parse_stco(cls, data: bytes) -> dict[str, tuple[int, ...]]:
+        return {'track.chunk_offsets': cls._unpack_table(data, 'I')}
+
+    @classmethod
+    def _parse_co64(cls, data: bytes) -> dict[str, tuple[int, ...]]:
+        return {'track.chunk_offsets': cls._unpack_table(data, 'Q')}
+
+    def _parse_chapter_track(self, fh: BinaryIO) -> None:
+        # QuickTime chapters are text samples of a track, which is
+        # referenced by the audio track
+        chapter_ids = {track_id for track in self._tracks
+                       for track_id in track.get('chapter_ids', ())}
+        for track in self._tracks:
+            if (track.get('id') not in chapter_ids
+                    or track.get('handler') not in self._CHAPTER_HANDLERS):
+                continue
+            sizes = track.get('sample_sizes', ())
+            sample_to_chunk = track.get('sample_to_chunk', ())
+            # sample offsets, each chunk contains consecutive samples
+            offsets = []
+            entry_idx = 0
+            samples_per_chunk = 0
+            for chunk, offset in enumerate(
+                    track.get('chunk_offsets', ()), start=1):
+                while (entry_idx < len(sample_to_chunk)
+                       and sample_to_chunk[entry_idx] <= chunk):
+                    samples_per_chunk = sample_to_chunk[entry_idx + 1]
+                    entry_idx += 3
+                for _i in range(samples_per_chunk):
+                    if len(offsets) >= len(sizes):
+                        break
+                    offsets.append(offset)
+                    offset += sizes[len(offsets) - 1]
+            # sample start times
+            time_to_sample = track.get('time_to_sample', ())
+            starts = []
+            time = 0
+            for idx in range(0, len(time_to_sample), 2):
+                count, delta = time_to_sample[idx:idx + 2]
+                for _i in range(min(count, len(offsets) - len(starts))):
+                    starts.append(time)
+                    time += delta
+            timescale = track.get('timescale') or 1
+            chapters = []
+            for offset, size, start in zip(offsets, sizes, starts):
+                fh.seek(offset)
+                sample = fh.read(size)
+                if len(sample) < 2:
+                    break
+                text = sample[2:2 + _UINT16_BE.unpack_from(sample)[0]]
+                if text[:2] in {b'\xfe\xff', b'\xff\xfe'}:
+                    title = text.decode('utf-16', 'replace')
+                else:
+                    title = text.decode('utf-8', 'replace')
+                chapters.append((start / timescale, title))
+            self._chapters = chapters
+            return
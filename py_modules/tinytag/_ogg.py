@@ -0,0 +1,416 @@
+# SPDX-FileCopyrightText: 2014-2025 tinytag Contributors
+# SPDX-License-Identifier: MIT
+
+"""OGG audio parser."""
+
+from __future__ import annotations
+from binascii import a2b_base64
+from io import BytesIO
+from os import SEEK_CUR
+from struct import Struct, error as struct_error
+
+from .tinytag import _DEBUG, _UINT32_LE, ParseError, TinyTag
+
+TYPE_CHECKING = False
+
+# Lazy imports for type checking
+if TYPE_CHECKING:
+    from collections.abc import Iterator  # pylint: disable-all
+    from typing import BinaryIO
+
+    from .tinytag import Image
+
+
+class _Ogg(TinyTag):
+    """OGG Parser."""
+
+    _READS_FILE_HEADER = True
+
+    _VORBIS_MAPPING = {
+        'album': 'album',
+        'albumartist': 'albumartist',
+        'title': 'title',
+        'artist': 'artist',
+        'artists': 'artist',
+        'author': 'artist',
+        'date': 'year',
+        'tracknumber': 'track',
+        'tracktotal': 'track_total',
+        'totaltracks': 'track_total',
+        'discnumber': 'disc',
+        'disctotal': 'disc_total',
+        'totaldiscs': 'disc_total',
+        'genre': 'genre',
+        'description': 'comment',
+        'comment': 'comment',
+        'comments': 'comment',
+        'composer': 'composer',
+        'bpm': 'other.bpm',
+        'copyright': 'other.copyright',
+        'isrc': 'other.isrc',
+        'lyrics': 'other.lyrics',
+        'unsyncedlyrics': 'other.lyrics',
+        'publisher': 'other.publisher',
+        'language': 'other.language',
+        'director': 'other.director',
+        'website': 'other.url',
+        'conductor': 'other.conductor',
+        'lyricist': 'other.lyricist',
+        'discsubtitle': 'other.set_subtitle',
+        'setsubtitle': 'other.set_subtitle',
+        'initialkey': 'other.initial_key',
+        'key': 'other.initial_key',
+        'encodedby': 'other.encoded_by',
+        'encodersettings': 'other.encoder_settings',
+        'media': 'other.media',
+        'license': 'other.license',
+        'barcode': 'other.barcode',
+        'catalognumber': 'other.catalog_number',
+        'movementname': 'other.movement_name',
+        'movement': 'other.movement',
+        'movementtotal': 'other.movement_total',
+        'showmovement': 'other.show_movement',
+        'grouping': 'other.grouping',
+        'contentgroup': 'other.grouping',
+        'work': 'other.work'
+    }
+    _BASE64_HEADER_SIZE = 4096
+    _PAGE_HEADER = Struct('<4sBBqIIIB')
+    _INT32 = Struct('<i')
+    _INT32_PAIR = Struct('<ii')
+    _VORBIS_HEAD = Struct('<Bi')  # channels, sample rate
+    _OPUS_HEAD = Struct('<BBH')  # version, channels, pre-skip
+    _PAGE_BLOCK_SIZE = 1 << 22  # bytes read at once when walking pages
+    # identification headers of audio streams, which start a chain link
+    _AUDIO_HEADERS = (b'\x01vorbis', b'OpusHead', b'\x7fFLAC', b'Speex   ')
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._granule_pos = 0
+        self._pre_skip = 0  # number of samples to skip in opus stream
+        self._audio_size: int | None = None  # size of opus audio stream
+        self._check_flac_second_packet = False
+        self._check_speex_second_packet = False
+        self._chained_links: list[_Ogg] = []  # links after the first one
+
+    def _determine_duration(self, fh: BinaryIO) -> None:
+        if not self._tags_parsed:
+            self._parse_tag(fh)  # determine sample rate
+        self._set_duration()
+        if not self._chained_links:
+            return
+        # this tag describes the whole file, keep the first link separately
+        first_link = _Ogg()
+        first_link._update(self)
+        links: list[_Ogg] = [first_link, *self._chained_links]
+        for link in self._chained_links:
+            link._set_duration()
+        self._links = list(links)
+        durations = [link.duration for link in links]
+        if None in durations:
+            return
+        self.duration = duration = sum(durations)  # type: ignore[arg-type]
+        if duration and all(link.bitrate is not None for link in links):
+            self.bitrate = sum(
+                link.bitrate * link.duration  # type: ignore[operator]
+                for link in links) / duration
+
+    def _set_duration(self) -> None:
+        if self.duration is not None or not self.samplerate:
+            return  # either ogg flac or invalid file
+        self.duration = max(
+            (self._granule_pos - self._pre_skip) / self.samplerate, 0
+        )
+        if self._audio_size is None or not self.duration:
+            return  # not an opus file
+        self.bitrate = self._audio_size * 8 / self.duration / 1000
+
+    def _parse_tag(self, fh: BinaryIO) -> None:
+        for link, packet in self._parse_pages(fh):
+            link._parse_packet(packet)
+            if self._tags_parsed and not self._parse_duration:
+                return
+        self._tags_parsed = True
+
+    def _parse_packet(self, packet: bytearray) -> None:
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from ._flac import _Flac
+        if packet.startswith(b"\x01vorbis"):
+            if self._parse_duration:
+                self.channels, self.samplerate = (
+                    self._VORBIS_HEAD.unpack_from(packet, 11))
+                self.bitrate = self._INT32.unpack_from(packet, 20)[0] / 1000
+        elif packet.startswith(b"\x03vorbis"):
+            if self._parse_tags:
+                walker = BytesIO(packet)
+                walker.seek(7)  # jump over header name
+                self._parse_vorbis_comment(walker)
+        elif packet.startswith(b'OpusHead'):
+            if self._parse_duration:  # parse opus header
+                # https://www.videolan.org/developers/vlc/modules/codec/opus_header.c
+                # https://mf4.xiph.org/jenkins/view/opus/job/opusfile-unix/ws/doc/html/structOpusHead.html
+                version, ch, pre_skip = (
+                    self._OPUS_HEAD.unpack_from(packet, 8))
+                if (version & 0xF0) == 0:  # only major version 0 supported
+                    self.channels = ch
+                    self.samplerate = 48000
+                    self._pre_skip = pre_skip
+        elif packet.startswith(b'OpusTags'):
+            if self._parse_tags:  # parse opus metadata:
+                walker = BytesIO(packet)
+                walker.seek(8)  # jump over header name
+                self._parse_vorbis_comment(walker)
+            self._audio_size = 0  # start counting size of audio stream
+        elif packet.startswith(b'\x7fFLAC'):
+            # https://xiph.org/flac/ogg_mapping.html
+            walker = BytesIO(packet)
+            # jump over header name, version and number of headers
+            walker.seek(9)
+            # pylint: disable=protected-access
+            flactag = _Flac()
+            flactag._filehandler = walker
+            flactag.filesize = self.filesize
+            flactag._load(
+                tags=self._parse_tags, duration=self._parse_duration,
+                image=self._load_image)
+            self._update(flactag)
+            self._check_flac_second_packet = True
+        elif self._check_flac_second_packet:
+            # second packet contains FLAC metadata block
+            if self._parse_tags:
+                walker = BytesIO(packet)
+                meta_header = walker.read(4)
+                block_type = meta_header[0] & 0x7f
+                # pylint: disable=protected-access
+                if block_type == _Flac._VORBIS_COMMENT:
+                    self._parse_vorbis_comment(walker)
+            self._check_flac_second_packet = False
+        elif packet.startswith(b'Speex   '):
+            # https://speex.org/docs/manual/speex-manual/node8.html
+            if self._parse_duration:
+                self.samplerate = self._INT32.unpack_from(packet, 36)[0]
+                self.channels, self.bitrate = (
+                    self._INT32_PAIR.unpack_from(packet, 48))
+            self._check_speex_second_packet = True
+        elif self._check_speex_second_packet:
+            if self._parse_tags:
+                walker = BytesIO(packet)
+                # starts with a comment string
+                length = _UINT32_LE.unpack(walker.read(4))[0]
+                comment = walker.read(length).decode('utf-8', 'replace')
+                self._set_field('comment', comment)
+                # other tags
+                self._parse_vorbis_comment(walker, has_vendor=False)
+            self._check_speex_second_packet = False
+        else:
+            # Optimization: If we need to determine the duration, read
+            # granule_pos of remaining pages, but skip contents of
+            # segments. If we don't need the duration, stop here.
+            self._tags_parsed = True
+
+    def _new_link(self) -> _Ogg:
+        # a chained stream, which is parsed with the same options
+        link = _Ogg()
+        link.filename = self.filename
+        link.filesize = self.filesize
+        link._parse_tags = self._parse_tags
+        link._parse_duration = self._parse_duration
+        link._load_image = self._load_image
+        link._fields = self._fields
+        self._chained_links.append(link)
+        return link
+
+    def _parse_vorbis_comment(self,
+                              fh: BinaryIO,
+                              has_vendor: bool = True,
+                              base_offset: int | None = None) -> None:
+        # base_offset is the file position of fh, if it holds contiguous
+        # file data, and allows loading images lazily
+        # for the spec, see: http://xiph.org/vorbis/doc/v-comment.html
+        # discnumber tag based on: https://en.wikipedia.org/wiki/Vorbis_comment
+        # https://sno.phy.queensu.ca/~phil/exiftool/TagNames/Vorbis.html
+        if has_vendor:
+            vendor_length = _UINT32_LE.unpack(fh.read(4))[0]
+            fh.seek(vendor_length, SEEK_CUR)  # jump over vendor
+        elements = _UINT32_LE.unpack(fh.read(4))[0]
+        for _i in range(elements):
+            length = _UINT32_LE.unpack(fh.read(4))[0]
+            keyvalpair = fh.read(length)
+            if b'=' in keyvalpair:
+                key_data, value_data = keyvalpair.split(b'=', 1)
+                key_lower = key_data.decode('utf-8', 'replace').lower()
+                if key_lower == "metadata_block_picture":
+                    if self._load_image:
+                        value = value_data.decode('utf-8', 'replace')
+                        if _DEBUG:
+                            print('Found Vorbis Image', value[:64])
+                        # pylint: disable=import-outside-toplevel
+                        # pylint: disable=protected-access,cyclic-import
+                        from ._flac import _Flac
+                        if (base_offset is not None
+                                and self._image_source is not None
+                                and len(value) > self._BASE64_HEADER_SIZE):
+                            fieldname, fieldvalue = self._parse_lazy_image(
+                                value, self._image_source,
+                                base_offset + fh.tell() - len(value))
+                        else:
+                            fieldname, fieldvalue = _Flac._parse_image(
+                                BytesIO(a2b_base64(value)))
+                        self.images._set_field(fieldname, fieldvalue)
+                else:
+                    fieldname = self._VORBIS_MAPPING.get(
+                        key_lower, self._OTHER_PREFIX + key_lower)
+                    if not self._is_field_wanted(fieldname):
+                        continue  # skip decoding unrequested values
+                    value = value_data.decode('utf-8', 'replace')
+                    if _DEBUG:
+                        print('Found Vorbis Comment', key_lower, value[:64])
+                    if fieldname in {
+                        'track', 'disc', 'track_total', 'disc_total'
+                    }:
+                        if fieldname in {'track', 'disc'} and '/' in value:
+                            value, total = value.split('/')[:2]
+                            if total.isdecimal():
+                                self._set_field(
+                                    f'{fieldname}_total', int(total))
+                        if value.isdecimal():
+                            self._set_field(fieldname, int(value))
+                    elif value:
+                        self._set_field(fieldname, value)
+
+    @classmethod
+    def _parse_lazy_image(cls,
+                          value: str,
+                          image_source: str | BinaryIO,
+                          value_offset: int) -> tuple[str, Image]:
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from ._flac import _Flac
+        # only decode the picture header, the image data follows it
+        header = a2b_base64(value[:cls._BASE64_HEADER_SIZE])
+        # pylint: disable=protected-access
+        try:
+            fieldname, image = _Flac._parse_image(
+                BytesIO(header), image_source)
+        except struct_error:  # picture header is too long
+            return _Flac._parse_image(BytesIO(a2b_base64(value)))
+        header_size = image.offset or 0
+        if header_size > len(header):
+            return _Flac._parse_image(BytesIO(a2b_base64(value)))
+        # the value may end before the picture does
+        decoded_size = len(value) * 3 // 4 - value[-2:].count('=')
+        image._set_file_range(
+            image_source, value_offset,
+            max(min(image.size, decoded_size - header_size), 0),
+            encoding='base64', stored_size=len(value), skip=header_size)
+        return fieldname, image
+
+    def _read_pages(self, fh: BinaryIO, size: int) -> bytes:
+        # while packets are collected, only read the requested bytes, since
+        # the rest of the file may not be needed at all
+        if self._tags_parsed:
+            size = max(size, min(
+                self._PAGE_BLOCK_SIZE, self.filesize - fh.tell()))
+        return fh.read(size)
+
+    def _parse_pages(self,
+                     fh: BinaryIO) -> Iterator[tuple[_Ogg, bytearray]]:
+        # for the spec, see: https://wiki.xiph.org/Ogg
+        # Each chain link is a logical audio stream, which starts after the
+        # previous one has ended. Other multiplexed streams are skipped.
+        link = self
+        packet_data = bytearray()
+        current_serial = None
+        link_ended = False
+        last_granule_pos = 0
+        last_audio_size = 0
+        header_len = 27
+        # pages are walked in a buffer, pos is the current page position
+        buffer = self._read_file_header(fh, header_len)
+        pos = 0
+        while True:
+            if len(buffer) - pos < header_len:
+                buffer = buffer[pos:] + self._read_pages(
+                    fh, header_len - len(buffer) + pos)
+                pos = 0
+                if len(buffer) < header_len:
+                    break
+            # https://xiph.org/ogg/doc/framing.html
+            (magic, version, header_type, granule_pos, serial, _seq, _crc,
+             segments) = self._PAGE_HEADER.unpack_from(buffer, pos)
+            if magic != b'OggS' or version != 0:
+                if link_ended:
+                    break  # ignore data after the last stream
+                raise ParseError('Invalid OGG header')
+            eos = header_type & 0x04
+            body_pos = pos + header_len + segments
+            if len(buffer) < body_pos:
+                buffer = buffer[pos:] + self._read_pages(
+                    fh, body_pos - len(buffer))
+                body_pos -= pos
+                pos = 0
+            seg_sizes = buffer[pos + header_len:body_pos]
+            page_end = body_pos + sum(seg_sizes)
+            if len(buffer) < page_end and (
+                    current_serial is None or link_ended):
+                # beginning of a stream, check if it contains audio
+                buffer = buffer[pos:] + self._read_pages(
+                    fh, page_end - len(buffer))
+                body_pos -= pos
+                page_end -= pos
+                pos = 0
+            if current_serial is None or link_ended:
+                bos = header_type & 0x02
+                if (bos and buffer.startswith(self._AUDIO_HEADERS, body_pos)
+                        or not bos and current_serial is None):
+                    if current_serial is not None:
+                        link = self._new_link()
+                        last_granule_pos = last_audio_size = 0
+                    current_serial = serial
+                    link_ended = False
+            serial_match = serial == current_serial and not link_ended
+            if serial_match and granule_pos > 0:
+                if eos:
+                    link._granule_pos = granule_pos
+                else:
+                    link._granule_pos = last_granule_pos
+                    last_granule_pos = granule_pos
+            audio_size = 0
+            if serial_match and not link._tags_parsed:
+                if len(buffer) < page_end:
+                    buffer = buffer[pos:] + fh.read(page_end - len(buffer))
+                    body_pos -= pos
+                    page_end -= pos
+                    pos = 0
+                packet_pos = read_pos = body_pos
+                for seg_size in seg_sizes:  # read all segments
+                    read_pos += seg_size
+                    if link._audio_size is not None:
+                        audio_size += seg_size
+                    # less than 255 bytes means end of packet
+                    if seg_size < 255 and not link._tags_parsed:
+                        packet_data += buffer[packet_pos:read_pos]
+                        yield link, packet_data
+                        packet_data.clear()
+                        packet_pos = read_pos
+                if packet_pos < read_pos and not link._tags_parsed:
+                    # packet continues on next page
+                    packet_data += buffer[packet_pos:read_pos]
+            elif link._audio_size is not None:
+                audio_size = page_end - body_pos
+            if serial_match and link._audio_size is not None:
+                if eos:
+                    link._audio_size += last_audio_size + audio_size
+                else:
+                    link._audio_size += last_audio_size
+                    last_audio_size = audio_size
+            if serial_match and eos:
+                link_ended = True
+                link._tags_parsed = True
+                packet_data.clear()
+                if not self._parse_duration:
+                    break
+            pos = page_end
+            if pos > len(buffer):  # jump over the rest of the page
+                fh.seek(pos - len(buffer), SEEK_CUR)
+                buffer = b''
+                pos = 0
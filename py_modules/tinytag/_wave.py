@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: 2014-2025 tinytag Contributors
+# SPDX-License-Identifier: MIT
+
+"""WAVE audio parser."""
+
+from __future__ import annotations
+from struct import Struct
+
+from ._id3 import _ID3
+from .tinytag import (
+    _UINT16_LE, _UINT32_LE, _UINT64_LE, ParseError, TinyTag)
+
+TYPE_CHECKING = False
+
+# Lazy imports for type checking
+if TYPE_CHECKING:
+    from typing import BinaryIO  # pylint: disable-all
+
+
+class _Wave(TinyTag):
+    """WAVE Parser.
+
+    https://sno.phy.queensu.ca/~phil/exiftool/TagNames/RIFF.html
+    https://tech.ebu.ch/docs/tech/tech3306v1_1.pdf (RF64)
+    https://www.itu.int/rec/R-REC-BS.2088/en (BW64)
+    """
+
+    _READS_FILE_HEADER = True
+    _FMT_HEADER = Struct('<HHI')  # format tag, channels, sample rate
+    # RIFF size, data size, sample count, table length
+    _DS64_HEADER = Struct('<QQQI')
+
+    _RIFF_MAPPING = {
+        b'INAM': 'title',
+        b'TITL': 'title',
+        b'IPRD': 'album',
+        b'IART': 'artist',
+        b'IBPM': 'other.bpm',
+        b'ICMT': 'comment',
+        b'IMUS': 'composer',
+        b'ICOP': 'other.copyright',
+        b'ICRD': 'year',
+        b'IGNR': 'genre',
+        b'ILNG': 'other.language',
+        b'ISRC': 'other.isrc',
+        b'IPUB': 'other.publisher',
+        b'IPRT': 'track',
+        b'ITRK': 'track',
+        b'TRCK': 'track',
+        b'IBSU': 'other.url',
+        b'YEAR': 'year',
+        b'IWRI': 'other.lyricist',
+        b'IENC': 'other.encoded_by',
+        b'IMED': 'other.media',
+    }
+
+    _RIFF_IDS = {b'RIFF', b'RF64', b'BW64'}
+    # 32-bit chunk size of chunks larger than 4 GB, real size is in ds64
+    _SIZE_IN_DS64 = 0xFFFFFFFF
+
+    def _determine_duration(self, fh: BinaryIO) -> None:
+        if not self._tags_parsed:
+            self._parse_tag(fh)
+
+    def _parse_tag(self, fh: BinaryIO) -> None:
+        # http://www-mmsp.ece.mcgill.ca/Documents/AudioFormats/WAVE/WAVE.html
+        # https://en.wikipedia.org/wiki/WAV
+        header = self._read_file_header(fh, 12)
+        if header[:4] not in self._RIFF_IDS or header[8:12] != b'WAVE':
+            raise ParseError('Invalid WAV header')
+        if self._parse_duration:
+            self.bitdepth = 16  # assume 16bit depth (CD quality)
+        header_len = 8
+        chunk_offset = 12
+        large_sizes: dict[bytes, int] = {}  # 64-bit sizes from ds64 chunk
+        chunk_header = fh.read(header_len)
+        while len(chunk_header) == header_len:
+            subchunk_id = chunk_header[:4]
+            subchunk_size = _UINT32_LE.unpack_from(chunk_header, 4)[0]
+            if subchunk_size == self._SIZE_IN_DS64:
+                # without a ds64 entry, assume the chunk spans the rest of
+                # the file, like plain RIFF files over 4 GB written this way
+                subchunk_size = large_sizes.get(
+                    subchunk_id,
+                    max(self.filesize - chunk_offset - header_len, 0))
+            self._chunks.append(
+                (subchunk_id, chunk_offset + header_len, subchunk_size))
+            # IFF chunks are padded to an even number of bytes
+            subchunk_size += subchunk_size % 2
+            chunk_offset += header_len + subchunk_size
+            if subchunk_id == b'ds64':
+                large_sizes = self._parse_ds64_chunk(fh.read(subchunk_size))
+            elif self._parse_duration and subchunk_id == b'fmt ':
+                chunk = fh.read(subchunk_size)
+                _format_tag, channels, samplerate = (
+                    self._FMT_HEADER.unpack_from(chunk))
+                bitdepth = _UINT16_LE.unpack_from(chunk, 14)[0]
+                if bitdepth == 0:
+                    # Certain codecs (e.g. GSM 6.10) give us a bit depth of
+                    # zero. Avoid division by zero when calculating duration.
+                    bitdepth = 1
+                self.bitrate = samplerate * channels * bitdepth / 1000
+                self.channels, self.samplerate, self.bitdepth = (
+                    channels, samplerate, bitdepth)
+            elif self._parse_duration and subchunk_id == b'data':
+                if (self.channels is not None and self.samplerate is not None
+                        and self.bitdepth is not None):
+                    self.duration = (
+                        subchunk_size / self.channels / self.samplerate
+                        / (self.bitdepth / 8))
+            elif self._parse_tags and subchunk_id == b'LIST':
+                chunk = fh.read(subchunk_size)
+                if chunk.startswith(b'INFO'):
+                    self._parse_info_chunk(chunk)
+            elif self._parse_tags and subchunk_id in {b'id3 ', b'ID3 '}:
+                # pylint: disable=protected-access
+                id3 = _ID3()
+                id3._filehandler = fh
+                id3._image_source = self._image_source
+                id3._fields = self._fields
+                id3._load(tags=True, duration=False, image=self._load_image)
+                self._update(id3)
+            if ((not self._parse_duration or self.duration is not None)
+                    and (not self._parse_tags or self._wanted_fields_found())):
+                break  # everything requested was found, skip the rest
+            # hop to the next chunk header, skipping unread chunk data
+            fh.seek(chunk_offset)
+            chunk_header = fh.read(header_len)
+        self._tags_parsed = True
+
+    @classmethod
+    def _parse_ds64_chunk(cls, chunk: bytes) -> dict[bytes, int]:
+        # RF64/BW64 store sizes over 4 GB in a 'ds64' chunk following the
+        # file header
+        if len(chunk) < 28:
+            return {}
+        _riff_size, data_size, _sample_count, table_length = (
+            cls._DS64_HEADER.unpack_from(chunk))
+        large_sizes = {b'data': data_size}
+        for pos in range(28, min(28 + table_length * 12, len(chunk)) - 11, 12):
+            large_sizes[chunk[pos:pos + 4]] = _UINT64_LE.unpack_from(
+                chunk, pos + 4)[0]
+        return large_sizes
+
+    def _parse_info_chunk(self, chunk: bytes) -> None:
+        pos = 4  # skip header
+        while pos + 8 <= len(chunk):
+            field = chunk[pos:pos + 4]
+            data_length = _UINT32_LE.unpack_from(chunk, pos + 4)[0]
+            pos += 8
+            # IFF chunks are padded to an even size
+            data_length += data_length % 2
+            # strip zero-byte
+            data = chunk[pos:pos + data_length].split(b'\x00', 1)[0]
+            pos += data_length
+            fieldname = self._RIFF_MAPPING.get(field)
+            if fieldname and self._is_field_wanted(fieldname):
+                value = data.decode('utf-8', 'replace')
+                if fieldname == 'track':
+                    if value.isdecimal():
+                        self._set_field(fieldname, int(value))
+                else:
+                    self._set_field(fieldname, value)
@@ -0,0 +1,168 @@
+# SPDX-FileCopyrightText: 2014-2025 tinytag Contributors
+# SPDX-License-Identifier: MIT
+
+"""WMA audio parser."""
+
+from __future__ import annotations
+from struct import Struct, unpack_from
+
+from .tinytag import _UINT16_LE, _UINT32_LE, _UINT64_LE, ParseError, TinyTag
+
+TYPE_CHECKING = False
+
+# Lazy imports for type checking
+if TYPE_CHECKING:
+    from typing import BinaryIO  # pylint: disable-all
+
+
+class _Wma(TinyTag):
+    """WMA Parser.
+
+    http://web.archive.org/web/20131203084402/http://msdn.microsoft.com/en-us/library/bb643323.aspx
+    http://uguisu.skr.jp/Windows/format_asf.html
+    """
+
+    _READS_FILE_HEADER = True
+
+    _ASF_MAPPING = {
+        'WM/ARTISTS': 'artist',
+        'WM/TrackNumber': 'track',
+        'WM/PartOfSet': 'disc',
+        'WM/Year': 'year',
+        'WM/AlbumArtist': 'albumartist',
+        'WM/Genre': 'genre',
+        'WM/AlbumTitle': 'album',
+        'WM/Composer': 'composer',
+        'WM/Publisher': 'other.publisher',
+        'WM/BeatsPerMinute': 'other.bpm',
+        'WM/InitialKey': 'other.initial_key',
+        'WM/Lyrics': 'other.lyrics',
+        'WM/Language': 'other.language',
+        'WM/Director': 'other.director',
+        'WM/AuthorURL': 'other.url',
+        'WM/ISRC': 'other.isrc',
+        'WM/Conductor': 'other.conductor',
+        'WM/Writer': 'other.lyricist',
+        'WM/SetSubTitle': 'other.set_subtitle',
+        'WM/EncodedBy': 'other.encoded_by',
+        'WM/EncodingSettings': 'other.encoder_settings',
+        'WM/Media': 'other.media',
+        'WM/Barcode': 'other.barcode',
+        'WM/CatalogNo': 'other.catalog_number',
+        'WM/ContentGroupDescription': 'other.grouping',
+        'WM/Work': 'other.work'
+    }
+    _UNPACK_FORMATS = {
+        1: Struct('<B'),
+        2: Struct('<H'),
+        4: Struct('<I'),
+        8: Struct('<Q')
+    }
+    _CONTENT_DESC_FIELDS = (
+        'title', 'artist', 'other.copyright', 'comment', '_rating')
+    _ASF_CONTENT_DESC = b'3&\xb2u\x8ef\xcf\x11\xa6\xd9\x00\xaa\x00b\xcel'
+    _ASF_EXT_CONTENT_DESC = (b'@\xa4\xd0\xd2\x07\xe3\xd2\x11\x97\xf0\x00'
+                             b'\xa0\xc9^\xa8P')
+    _STREAM_BITRATE_PROPS = (b'\xceu\xf8{\x8dF\xd1\x11\x8d\x82\x00`\x97\xc9'
+                             b'\xa2\xb2')
+    _ASF_FILE_PROP = b'\xa1\xdc\xab\x8cG\xa9\xcf\x11\x8e\xe4\x00\xc0\x0c Se'
+    _ASF_STREAM_PROPS = (b'\x91\x07\xdc\xb7\xb7\xa9\xcf\x11\x8e\xe6\x00\xc0'
+                         b'\x0c Se')
+    _STREAM_TYPE_ASF_AUDIO_MEDIA = b'@\x9ei\xf8M[\xcf\x11\xa8\xfd\x00\x80_\\D+'
+
+    def _determine_duration(self, fh: BinaryIO) -> None:
+        if not self._tags_parsed:
+            self._parse_tag(fh)
+
+    def _parse_tag(self, fh: BinaryIO) -> None:
+        # http://www.garykessler.net/library/file_sigs.html
+        # http://web.archive.org/web/20131203084402/http://msdn.microsoft.com/en-us/library/bb643323.aspx#_Toc521913958
+        header = self._read_file_header(fh, 30)
+        if (header[:16] != b'0&\xb2u\x8ef\xcf\x11\xa6\xd9\x00\xaa\x00b\xcel'
+                or header[-1:] != b'\x02'):
+            raise ParseError('Invalid WMA header')
+        # all metadata lives in the header object, which precedes the data
+        # packets; read it in one go and walk its declared child objects
+        header_size = _UINT64_LE.unpack_from(header, 16)[0]
+        object_count = _UINT32_LE.unpack_from(header, 24)[0]
+        data = fh.read(max(min(header_size, self.filesize) - len(header), 0))
+        pos = 0
+        for _ in range(object_count):
+            if pos + 24 > len(data):
+                break
+            object_id = data[pos:pos + 16]
+            object_size = _UINT64_LE.unpack_from(data, pos + 16)[0]
+            if object_size < 24 or pos + object_size > len(data):
+                break  # invalid object, stop parsing.
+            content = data[pos + 24:pos + object_size]
+            pos += object_size
+            if self._parse_tags and object_id == self._ASF_CONTENT_DESC:
+                self._parse_content_description(content)
+            elif self._parse_tags and object_id == self._ASF_EXT_CONTENT_DESC:
+                self._parse_ext_content_description(content)
+            elif self._parse_duration and object_id == self._ASF_FILE_PROP:
+                play_duration = _UINT64_LE.unpack_from(
+                    content, 40)[0] / 10000000
+                preroll = _UINT64_LE.unpack_from(content, 56)[0] / 1000
+                # subtract the preroll to get the actual duration
+                self.duration = max(play_duration - preroll, 0.0)
+            elif self._parse_duration and object_id == self._ASF_STREAM_PROPS:
+                stream_type = content[:16]
+                if stream_type == self._STREAM_TYPE_ASF_AUDIO_MEDIA:
+                    (codec_id_format_tag, self.channels, self.samplerate,
+                     avg_bytes_per_second) = unpack_from(
+                         '<HHII', content, 54)
+                    self.bitrate = avg_bytes_per_second * 8 / 1000
+                    if codec_id_format_tag == 355:  # lossless
+                        self.bitdepth = _UINT16_LE.unpack_from(
+                            content, 68)[0]
+        self._tags_parsed = True
+
+    def _parse_content_description(self, content: bytes) -> None:
+        lengths = unpack_from('<5H', content)
+        pos = 10
+        for field_name, length in zip(self._CONTENT_DESC_FIELDS, lengths):
+            value = self._unpad(
+                content[pos:pos + length].decode('utf-16', 'replace'))
+            pos += length
+            if not field_name.startswith('_') and value:
+                self._set_field(field_name, value)
+
+    def _parse_ext_content_description(self, content: bytes) -> None:
+        # http://web.archive.org/web/20131203084402/http://msdn.microsoft.com/en-us/library/bb643323.aspx#_Toc509555195
+        descriptor_count = _UINT16_LE.unpack_from(content)[0]
+        pos = 2
+        for _ in range(descriptor_count):
+            name_len = _UINT16_LE.unpack_from(content, pos)[0]
+            pos += 2
+            name = self._unpad(
+                content[pos:pos + name_len].decode('utf-16', 'replace'))
+            pos += name_len
+            value_type, value_len = unpack_from('<HH', content, pos)
+            pos += 4
+            value_data = content[pos:pos + value_len]
+            pos += value_len
+            # try to get normalized field name
+            if name in self._ASF_MAPPING:
+                field_name = self._ASF_MAPPING[name]
+            else:  # custom field
+                if name.startswith('WM/'):
+                    name = name[3:]
+                field_name = self._OTHER_PREFIX + name.lower()
+            if not self._is_field_wanted(field_name):
+                continue  # skip unrequested
+            # Unicode string
+            if value_type == 0:
+                value = self._unpad(value_data.decode('utf-16', 'replace'))
+            # DWORD / QWORD / WORD
+            elif (1 < value_type < 6
+                    and value_len in self._UNPACK_FORMATS):
+                value = str(
+                    self._UNPACK_FORMATS[value_len].unpack(value_data)[0])
+            else:
+                continue  # skip other values
+            if field_name in {'track', 'disc'}:
+                if value.isdecimal():
+                    self._set_field(field_name, int(value))
+            elif value:
+                self._set_field(field_name, value)
@@ -0,0 +1,365 @@
+# SPDX-FileCopyrightText: 2014-2025 tinytag Contributors
+# SPDX-License-Identifier: MIT
+
+"""Parsing benchmarks for the sample files.
+
+Run with: python -m tinytag.tests.bench [benchmark ...]
+"""
+
+from __future__ import annotations
+
+import os.path
+from io import BytesIO
+from json import dumps, loads
+from struct import pack
+from subprocess import run
+from sys import argv, executable
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from tinytag import TinyTag
+from tinytag._id3 import _ID3
+
+TYPE_CHECKING = False
+
+# Lazy imports for type checking
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable  # pylint: disable-all
+
+SAMPLE_FOLDER = os.path.join(os.path.dirname(__file__), 'samples')
+# tag fields the music player plugin displays
+PLAYER_FIELDS = (
+    'title', 'artist', 'album', 'albumartist', 'disc', 'disc_total', 'track',
+    'track_total', 'genre', 'year')
+
+
+def sample_files() -> list[str]:
+    """Return the paths of all supported sample files."""
+    return sorted(
+        os.path.join(SAMPLE_FOLDER, name)
+        for name in os.listdir(SAMPLE_FOLDER)
+        if TinyTag.is_supported(name))
+
+
+def tag_heavy_files(count: int = 10) -> list[str]:
+    """Return the sample files with the most tag fields."""
+    field_counts = {}
+    for filename in sample_files():
+        try:
+            tag = TinyTag.get(filename, duration=False)
+        except Exception:  # pylint: disable=broad-exception-caught
+            continue
+        field_counts[filename] = sum(
+            len(value) if isinstance(value, list) else 1
+            for value in tag.as_dict().values())
+    return sorted(field_counts, key=field_counts.__getitem__)[-count:]
+
+
+def synthetic_id3(frame_count: int = 500) -> bytes:
+    """Return an MP3 file with many text frames and long lyrics."""
+    def frame(frame_id: bytes, content: bytes) -> bytes:
+        return frame_id + pack('>IH', len(content), 0) + content
+
+    frames = [frame(b'TIT2', b'\x00Title'), frame(b'TPE1', b'\x00Artist')]
+    frames += [
+        frame(b'T%03d' % i, b'\x01' + f'value {i}'.encode('utf-16'))
+        for i in range(frame_count)]
+    frames.append(frame(b'USLT', b'\x00eng\x00' + b'lyrics ' * 10000))
+    data = b''.join(frames)
+    size = bytes((len(data) >> shift) & 0x7f for shift in (21, 14, 7, 0))
+    return b'ID3\x03\x00\x00' + size + data
+
+
+def synthetic_flac(comment_count: int = 500) -> bytes:
+    """Return a FLAC file with many Vorbis comments."""
+    comments = [b'TITLE=Title', b'ARTIST=Artist']
+    comments += [b'CUSTOM%d=value %d' % (i, i) for i in range(comment_count)]
+    comments.append(b'LYRICS=' + b'lyrics ' * 10000)
+    block = pack('<I', 0) + pack('<I', len(comments)) + b''.join(
+        pack('<I', len(comment)) + comment for comment in comments)
+    streaminfo = bytes(10) + b'\x0a\xc4\x42\xf0' + bytes(20)
+    return (b'fLaC' + b'\x00' + pack('>I', len(streaminfo))[1:] + streaminfo
+            + b'\x84' + pack('>I', len(block))[1:] + block)
+
+
+def synthetic_mp4(custom_count: int = 5000) -> bytes:
+    """Return an MP4 file with many custom '----' metadata atoms."""
+    def atom(atom_type: bytes, content: bytes) -> bytes:
+        return pack('>I', len(content) + 8) + atom_type + content
+
+    def data(value: bytes) -> bytes:
+        return atom(b'data', pack('>II', 1, 0) + value)
+
+    items = [atom(b'\xa9nam', data(b'Title')),
+             atom(b'\xa9ART', data(b'Artist'))]
+    items += [
+        atom(b'----', atom(b'mean', b'\x00' * 4 + b'com.apple.iTunes')
+             + atom(b'name', b'\x00' * 4 + b'CUSTOM%d' % i)
+             + data(b'value %d' % i))
+        for i in range(custom_count)]
+    meta = atom(b'meta', b'\x00' * 4 + atom(b'ilst', b''.join(items)))
+    mvhd = atom(b'mvhd', bytes(12) + pack('>II', 1000, 60000) + bytes(80))
+    return (atom(b'ftyp', b'M4A \x00\x00\x02\x00M4A mp42isom')
+            + atom(b'moov', mvhd + atom(b'udta', meta)))
+
+
+def synthetic_sylt(line_count: int = 5000) -> bytes:
+    """Return the content of a UTF-16 synced lyrics frame."""
+    lines = b''.join(
+        f'line {i} with some text'.encode('utf-16') + b'\x00\x00'
+        + pack('>I', i * 1000) for i in range(line_count))
+    return b'\x01eng\x02\x01' + 'desc'.encode('utf-16') + b'\x00\x00' + lines
+
+
+def synthetic_vbr_mp3(seconds: int = 600) -> bytes:
+    """Return a VBR MP3 stream without a Xing header."""
+    frames = []
+    for bitrate_id, bitrate in ((9, 128), (11, 192), (14, 320)):
+        frame_length = 144000 * bitrate // 44100
+        frames.append(b'\xff\xfb' + bytes((bitrate_id << 4, 0))
+                      + bytes(frame_length - 4))
+    frame_count = seconds * 44100 // 1152
+    return b''.join(frames[i % 7 % 3] for i in range(frame_count))
+
+
+def synthetic_ogg(seconds: int = 600, serial: int = 1) -> bytes:
+    """Return an Ogg Vorbis stream with 4 KB audio pages at 128 kbit/s."""
+    def page(header_type: int, granule_pos: int, sequence: int,
+             packets: list[bytes]) -> bytes:
+        segments = bytearray()
+        for packet in packets:
+            segments += b'\xff' * (len(packet) // 255)
+            segments.append(len(packet) % 255)
+        return (b'OggS\x00' + pack('<BqIII', header_type, granule_pos,
+                                     serial, sequence, 0)
+                + bytes((len(segments),)) + segments + b''.join(packets))
+
+    identification = (b'\x01vorbis' + pack('<IBIiii', 0, 2, 44100, 0,
+                                           128000, 0) + b'\xb8\x01')
+    comment = b'\x03vorbis' + pack('<I', 6) + b'vendor' + pack(
+        '<II', 1, 11) + b'TITLE=Title' + b'\x01'
+    pages = [page(2, 0, 0, [identification]),
+             page(0, 0, 1, [comment, b'\x05vorbis'])]
+    audio_packet = bytes(4000)
+    page_count = seconds * 16000 // len(audio_packet)
+    for sequence in range(page_count):
+        pages.append(page(
+            4 if sequence == page_count - 1 else 0,
+            (sequence + 1) * 44100 * len(audio_packet) // 16000,
+            sequence + 2, [audio_packet]))
+    return b''.join(pages)
+
+
+def measure(sources: Iterable[str | bytes],
+            parse: Callable[..., object],
+            repeat: int = 20) -> float:
+    """Return the best time in seconds to parse all sources once.
+
+    Sources are file names or file contents.
+    """
+    sources = list(sources)
+    best = float('inf')
+    for _i in range(repeat):
+        start = perf_counter()
+        for source in sources:
+            try:
+                if isinstance(source, bytes):
+                    parse(file_obj=BytesIO(source))
+                else:
+                    parse(source)
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def bench_fields() -> None:
+    """Compare parsing all tag fields with parsing only player fields."""
+    for title, sources in (
+            ('all samples', sample_files()),
+            ('tag-heavy samples', tag_heavy_files()),
+            ('synthetic mp3', [synthetic_id3()]),
+            ('synthetic flac', [synthetic_flac()])):
+        all_fields = measure(
+            sources, lambda *args, **kwargs: TinyTag.get(
+                *args, duration=False, **kwargs))
+        player_fields = measure(
+            sources, lambda *args, **kwargs: TinyTag.get(
+                *args, duration=False, fields=PLAYER_FIELDS, **kwargs))
+        print(f'{title} ({len(sources)} files): '
+              f'all fields {all_fields * 1000:.2f} ms, '
+              f'player fields {player_fields * 1000:.2f} ms '
+              f'({1 - player_fields / all_fields:.0%} less)')
+
+
+def bench_utf16_strings() -> None:
+    """Measure parsing of null-terminated UTF-16 strings in ID3 frames."""
+    filenames = [
+        os.path.join(SAMPLE_FOLDER, name)
+        for name in os.listdir(SAMPLE_FOLDER)
+        if name.startswith('id3_comment_utf_16_')]
+    duration = measure(
+        filenames, lambda name: TinyTag.get(name, duration=False, image=True),
+        repeat=200)
+    print(f'id3_comment_utf_16_* samples ({len(filenames)} files): '
+          f'{duration * 1000:.3f} ms')
+    for line_count in (100, 5000):
+        content = synthetic_sylt(line_count)
+        tag = _ID3()
+        # pylint: disable=protected-access
+        duration = measure(
+            [content], lambda file_obj: tag._parse_synced_lyrics(
+                file_obj.getvalue()), repeat=20)
+        print(f'synthetic SYLT frame ({line_count} lines, '
+              f'{len(content)} bytes): {duration * 1000:.2f} ms')
+
+
+def bench_mp4() -> None:
+    """Measure traversing MP4 atoms."""
+    samples: list[tuple[str, list[str | bytes]]] = [
+        (name, [os.path.join(SAMPLE_FOLDER, name)])
+        for name in ('multi_value.m4a', 'mpeg4_with_image.m4a')]
+    samples.append(('synthetic, 5000 custom atoms', [synthetic_mp4()]))
+    for title, sources in samples:
+        duration = measure(
+            sources, lambda *args, **kwargs: TinyTag.get(
+                *args, image=True, **kwargs), repeat=100)
+        print(f'{title}: {duration * 1000:.3f} ms')
+
+
+def bench_mp3_exact_duration() -> None:
+    """Compare estimated and exact MP3 durations."""
+    data = synthetic_vbr_mp3()
+    size_mb = len(data) / 1_000_000
+    for title, kwargs in (
+            ('estimated', {}),
+            ('exact', {'duration_mode': 'exact'}),
+            ('exact with seek table', {
+                'duration_mode': 'exact', 'seek_table': True})):
+        duration = measure(
+            [data], lambda *args, kwargs=kwargs, **file_kwargs: TinyTag.get(
+                *args, tags=False, **kwargs, **file_kwargs), repeat=5)
+        print(f'synthetic VBR mp3, 10 minutes, {title}: '
+              f'{duration * 1000:.2f} ms ({size_mb / duration:.0f} MB/s)')
+
+
+def bench_ogg() -> None:
+    """Measure walking the pages of Ogg files."""
+    samples: list[tuple[str, list[str | bytes]]] = [
+        (name, [os.path.join(SAMPLE_FOLDER, name)])
+        for name in ('test.ogg', 'test.opus', 'multipagecomment.ogg')]
+    samples.append(('synthetic vorbis, 10 minutes', [synthetic_ogg()]))
+    for title, sources in samples:
+        duration = measure(sources, TinyTag.get, repeat=20)
+        print(f'{title}: {duration * 1000:.3f} ms')
+
+
+def bench_formats() -> None:
+    """Measure the parse rate of the sample files of each format."""
+    formats: dict[str, list[str]] = {}
+    for filename in sample_files():
+        extension = os.path.splitext(filename)[1].lower()
+        formats.setdefault(extension, []).append(filename)
+    for extension, filenames in sorted(formats.items()):
+        size_mb = sum(os.path.getsize(name) for name in filenames) / 1e6
+        duration = measure(
+            filenames, lambda *args, **kwargs: TinyTag.get(
+                *args, image=True, **kwargs), repeat=50)
+        print(f'{extension:6} {len(filenames):3} files: '
+              f'{len(filenames) / duration:8.0f} files/s, '
+              f'{size_mb / duration:7.1f} MB/s')
+
+
+def bench_records(count: int = 50000) -> None:
+    """Compare loading a library index of binary records and JSON."""
+    tags = []
+    for filename in sample_files():
+        try:
+            tags.append(TinyTag.get(filename, image=True, lazy_images=True))
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+    tags = [tags[i % len(tags)] for i in range(count)]
+    start = perf_counter()
+    records = [tag.to_bytes() for tag in tags]
+    encode_time = perf_counter() - start
+    index = dumps([tag.as_dict() for tag in tags])
+    start = perf_counter()
+    for record in records:
+        TinyTag.from_bytes(record)
+    decode_time = perf_counter() - start
+    start = perf_counter()
+    loads(index)
+    json_time = perf_counter() - start
+    start = perf_counter()
+    for fields in loads(index):
+        tag = TinyTag()
+        for key, value in fields.items():
+            if key not in tag.__dict__:
+                tag.other[key] = value
+            elif isinstance(value, list):
+                tag.__dict__[key] = value[0]
+            else:
+                tag.__dict__[key] = value
+    json_tags_time = perf_counter() - start
+    parse_time = measure(sample_files(), TinyTag.get, repeat=5) / len(
+        sample_files()) * count
+    print(f'{count} records: binary {sum(map(len, records)) / 1e6:.1f} MB, '
+          f'JSON {len(index) / 1e6:.1f} MB')
+    print(f'encode {encode_time * 1000:.0f} ms, '
+          f'decode {decode_time * 1000:.0f} ms, '
+          f'JSON decode {json_time * 1000:.0f} ms '
+          f'({json_tags_time * 1000:.0f} ms into tag objects), '
+          f're-parse {parse_time * 1000:.0f} ms (estimated)')
+
+
+def import_time(cached: bool = True) -> float:
+    """Return the cumulative import time of tinytag in seconds.
+
+    Bytecode is cached in an empty directory, warmed up first if cached.
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    command = [executable, '-X', 'importtime', '-c', 'import tinytag']
+    with TemporaryDirectory() as cache_dir:
+        env['PYTHONPYCACHEPREFIX'] = cache_dir
+        if cached:
+            run(command, env=env, capture_output=True, check=True)
+        result = run(command, env=env, capture_output=True, text=True,
+                      check=True)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _self_time, cumulative, name = line.split('|')
+        if name.strip() == 'tinytag':
+            return int(cumulative) / 1e6
+    raise RuntimeError('tinytag import not reported')
+
+
+def bench_import() -> None:
+    """Measure the time to import tinytag, parsers are loaded lazily."""
+    result = run(
+        [executable, '-c',
+         'import tinytag, sys; '
+         'print(" ".join(sorted(m for m in sys.modules '
+         'if m.startswith("tinytag"))))'],
+        capture_output=True, text=True, check=True)
+    cached = min(import_time() for _i in range(5))
+    uncached = min(import_time(cached=False) for _i in range(3))
+    print(f'import tinytag: {cached * 1000:.1f} ms with cached bytecode, '
+          f'{uncached * 1000:.1f} ms without')
+    print(f'modules loaded: {result.stdout.strip()}')
+
+
+BENCHMARKS: dict[str, Callable[[], None]] = {
+    'fields': bench_fields,
+    'formats': bench_formats,
+    'import': bench_import,
+    'mp3': bench_mp3_exact_duration,
+    'mp4': bench_mp4,
+    'ogg': bench_ogg,
+    'records': bench_records,
+    'utf16': bench_utf16_strings,
+}
+
+if __name__ == '__main__':
+    for benchmark in argv[1:] or BENCHMARKS:
+        BENCHMARKS[benchmark]()
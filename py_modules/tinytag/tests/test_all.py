@@ -8,14 +8,20 @@ from __future__ import annotations
 
 import os.path
 
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO, TextIOWrapper
 from math import isclose
 from pathlib import Path
 from platform import python_implementation, system
-from sys import stdout
+from struct import pack
+from subprocess import check_output
+from sys import executable, stdout
 from unittest import skipIf, TestCase
+from zlib import compress
 
-from tinytag import ParseError, TinyTagException, UnsupportedFormatError
+from tinytag import BufferRangeError, ParseError, TinyTagException
+from tinytag import UnsupportedFormatError
 from tinytag import Images, OtherFields, TinyTag
 from tinytag.tinytag import _ID3, _Ogg, _Wave, _Flac, _Wma, _MP4, _Aiff
 
@@ -1657,6 +1663,22 @@ class TestAll(TestCase):
                 self.compare_tag(results, filtered_expected, filename)
                 assert tag.images.any is None
 
+    def test_file_reading_fields(self) -> None:
+        fields = {'title', 'artist', 'track', 'track_total', 'lyrics'}
+        allowed_attrs = fields | {
+            'bitdepth', 'bitrate', 'channels', 'duration', 'filename',
+            'filesize', 'samplerate'}
+        for testfile in TEST_FILES:
+            with self.subTest(testfile=testfile):
+                filename = os.path.join(SAMPLE_FOLDER, testfile)
+                expected = {
+                    key: val
+                    for key, val in TinyTag.get(filename).as_dict().items()
+                    if key.lstrip('_') in allowed_attrs
+                }
+                tag = TinyTag.get(filename, fields=fields)
+                self.assertEqual(tag.as_dict(), expected)
+
     def test_pathlib_compatibility(self) -> None:
         testfile = next(iter(TEST_FILES.keys()))
         filename = Path(SAMPLE_FOLDER) / testfile
@@ -1767,6 +1789,114 @@ class TestAll(TestCase):
             "\\xa0lcm..', mime_type='image/jpeg', description='some image ë')"
         )
 
+    def test_lazy_image_loading(self) -> None:
+        for path, expected_offset in (
+            ('image-text-encoding.mp3', 88),
+            ('id3v22_with_image.mp3', 99),
+            ('mpeg4_with_image.m4a', 5347),
+            ('flac_with_image.flac', 301),
+            ('wav_with_image.wav', 17257),
+            ('aiff_with_image.aiff', 17543),
+        ):
+            with self.subTest(path=path):
+                filename = os.path.join(SAMPLE_FOLDER, path)
+                expected = TinyTag.get(filename, image=True).images.any
+                assert expected is not None
+                tag = TinyTag.get(filename, image=True, lazy_images=True)
+                image = tag.images.any
+                assert image is not None
+                self.assertEqual(image.offset, expected_offset)
+                self.assertEqual(image.size, len(expected.data))
+                self.assertEqual(image.mime_type, expected.mime_type)
+                self.assertEqual(image.description, expected.description)
+                self.assertNotIn('data=', repr(image))
+                buffer = bytearray(image.size + 10)
+                self.assertEqual(image.read_into(buffer), image.size)
+                self.assertEqual(buffer[:image.size], expected.data)
+                with image.open() as stream:
+                    self.assertEqual(stream.read(4), b'\xff\xd8\xff\xe0')
+                    self.assertEqual(stream.read(), expected.data[4:])
+                self.assertEqual(image.data, expected.data)
+                with open(filename, 'rb') as file_handle:
+                    tag = TinyTag.get(
+                        file_obj=file_handle, image=True, lazy_images=True)
+                    image = tag.images.any
+                    assert image is not None
+                    file_handle.seek(0)
+                    self.assertEqual(image.data, expected.data)
+
+    def test_lazy_image_truncated(self) -> None:
+        with open(os.path.join(SAMPLE_FOLDER, 'flac_with_image.flac'),
+                  'rb') as file_handle:
+            flac_data = file_handle.read()
+        image_data = bytes(range(256)) * 40
+        # the picture header claims more data than the comment holds
+        picture = (
+            pack('>II', 3, 10) + b'image/jpeg' + pack('>I', 0) + bytes(16)
+            + pack('>I', 100000) + image_data)
+        comment = b'METADATA_BLOCK_PICTURE=' + b64encode(picture)
+        vorbis_comment = (
+            pack('<I', 0) + pack('<I', 1) + pack('<I', len(comment))
+            + comment)
+        base64_data = (
+            flac_data[:42]
+            + bytes([0x84]) + len(vorbis_comment).to_bytes(3, 'big')
+            + vorbis_comment)
+        with open(os.path.join(SAMPLE_FOLDER, 'alac_file.m4a'),
+                  'rb') as file_handle:
+            mp4_data = file_handle.read()
+        for name, data in (('mp4', mp4_data), ('flac', flac_data[:400]),
+                           ('base64', base64_data)):
+            with self.subTest(name=name):
+                expected = TinyTag.get(
+                    file_obj=BytesIO(data), image=True).images.any
+                image = TinyTag.get(
+                    file_obj=BytesIO(data), image=True,
+                    lazy_images=True).images.any
+                assert expected is not None and image is not None
+                self.assertLess(len(expected.data), 100000)
+                self.assertEqual(image.size, len(expected.data))
+                target = BytesIO()
+                self.assertEqual(image.copy_to(target), image.size)
+                self.assertEqual(target.getvalue(), expected.data)
+
+    def test_lazy_image_base64_vorbis_comment(self) -> None:
+        image_data = bytes(range(256)) * 40
+        picture = (
+            pack('>II', 3, 10) + b'image/jpeg' + pack('>I', 4) + b'desc'
+            + bytes(16) + pack('>I', len(image_data)) + image_data)
+        comment = b'METADATA_BLOCK_PICTURE=' + b64encode(picture)
+        vorbis_comment = (
+            pack('<I', 0) + pack('<I', 1) + pack('<I', len(comment))
+            + comment)
+        with open(os.path.join(SAMPLE_FOLDER, 'flac1sMono.flac'),
+                  'rb') as file_handle:
+            streaminfo = file_handle.read(42)[4:]
+        flac_data = (
+            b'fLaC' + streaminfo
+            + bytes([0x84]) + len(vorbis_comment).to_bytes(3, 'big')
+            + vorbis_comment)
+        for lazy_images in (False, True):
+            with self.subTest(lazy_images=lazy_images):
+                tag = TinyTag.get(
+                    file_obj=BytesIO(flac_data), image=True,
+                    lazy_images=lazy_images)
+                image = tag.images.front_cover
+                assert image is not None
+                self.assertEqual(image.mime_type, 'image/jpeg')
+                self.assertEqual(image.description, 'desc')
+                self.assertEqual(image.size, len(image_data))
+                if lazy_images:
+                    self.assertEqual(image.encoding, 'base64')
+                    self.assertEqual(
+                        image.offset, len(flac_data) - len(comment) + 23)
+                    self.assertEqual(image.stored_size, len(comment) - 23)
+                target = BytesIO()
+                self.assertEqual(
+                    image.copy_to(target, chunk_size=1000), len(image_data))
+                self.assertEqual(target.getvalue(), image_data)
+                self.assertEqual(image.data, image_data)
+
     def test_mp3_utf_8_invalid_string(self) -> None:
         tag = TinyTag.get(
             os.path.join(SAMPLE_FOLDER, 'utf-8-id3v2-invalid-string.mp3'))
@@ -1792,6 +1922,490 @@ class TestAll(TestCase):
                 tag = TinyTag.get(filename)
                 self.assertIsInstance(tag, expected)
 
+    def test_detect_extension_case_insensitive(self) -> None:
+        for filename, expected in (
+            ('song.MP3', _ID3),
+            ('archive.tar.Flac', _Flac),
+            ('/music/album.m4a/track.OPUS', _Ogg),
+            ('.wav', _Wave),
+        ):
+            with self.subTest(filename=filename):
+                self.assertIs(
+                    TinyTag._get_parser_for_filename(filename), expected)
+        self.assertIsNone(TinyTag._get_parser_for_filename('mp3'))
+        self.assertIsNone(TinyTag._get_parser_for_filename('dir.mp3/file'))
+
+    def test_detect_magic_headers_file_obj(self) -> None:
+        filename = os.path.join(SAMPLE_FOLDER, 'detect_ogg_opus.x')
+        with open(filename, 'rb') as file_handle:
+            file_handle.seek(10)
+            tag = TinyTag.get(file_obj=file_handle)
+            file_handle.seek(0)
+            tag_bytesio = TinyTag.get(file_obj=BytesIO(file_handle.read()))
+        self.assertIsInstance(tag, _Ogg)
+        self.assertIsInstance(tag_bytesio, _Ogg)
+        self.assertEqual(tag.filesize, os.path.getsize(filename))
+        self.assertEqual(tag.as_dict(), tag_bytesio.as_dict())
+
+    def test_from_buffer(self) -> None:
+        for testfile, head_size, tail_size in (
+            ('cbr.mp3', 4096, 128),
+            ('vbr_xing_header.mp3', 1024, 128),
+            ('flac1sMono.flac', 512, 0),
+            ('mpeg4_with_image.m4a', 1 << 20, 0),
+            ('test.wav', 1 << 20, 0),
+        ):
+            with self.subTest(testfile=testfile):
+                filename = os.path.join(SAMPLE_FOLDER, testfile)
+                with open(filename, 'rb') as file_handle:
+                    data = file_handle.read()
+                tail = data[-tail_size:] if tail_size else b''
+                tag = TinyTag.from_buffer(
+                    data[:head_size], tail, len(data), filename=testfile)
+                expected = TinyTag.get(filename)
+                expected.filename = testfile
+                self.assertEqual(tag.as_dict(), expected.as_dict())
+
+    def test_from_buffer_missing_range(self) -> None:
+        filename = os.path.join(SAMPLE_FOLDER, 'cbr.mp3')
+        with open(filename, 'rb') as file_handle:
+            data = file_handle.read()
+        with self.assertRaises(BufferRangeError) as context:
+            TinyTag.from_buffer(data[:512], data[-128:], len(data))
+        self.assertIsInstance(context.exception, TinyTagException)
+        self.assertEqual(context.exception.offset, 512)
+        self.assertEqual(context.exception.size, 155)
+        tag = TinyTag.from_buffer(data[:512], data[-128:], len(data),
+                                  duration=False)
+        self.assertEqual(tag.title, 'I Can Walk On Water I Can Fly')
+
+    def test_id3v2_frame_flags(self) -> None:
+        def synchsafe(value: int) -> bytes:
+            return bytes((value >> shift) & 0x7f for shift in (21, 14, 7, 0))
+
+        def id3(major: int, flags: int, frames: bytes) -> BytesIO:
+            header = b'ID3' + bytes((major, 0, flags)) + synchsafe(len(frames))
+            return BytesIO(header + frames)
+
+        def frame_v4(frame_id: bytes, flags: int, content: bytes) -> bytes:
+            return (frame_id + synchsafe(len(content)) + b'\x00'
+                    + bytes((flags,)) + content)
+
+        title = b'\x00Title \xff\x00\xe9'
+        album = compress(b'\x00Album')
+        frames = (
+            frame_v4(b'TIT2', 0x02, title)
+            + frame_v4(b'TALB', 0x09, pack('>I', 6) + album)
+            + frame_v4(b'TPE1', 0x40, b'\x01\x00Artist')
+            + frame_v4(b'TCOM', 0x04, b'\x01secret')
+            + bytes(10)
+        )
+        tag = TinyTag.get('test.mp3', file_obj=id3(4, 0, frames))
+        self.assertEqual(tag.title, 'Title \xff\xe9')
+        self.assertEqual(tag.album, 'Album')
+        self.assertEqual(tag.artist, 'Artist')
+        self.assertIsNone(tag.composer)
+
+        # ID3v2.3 unsynchronisation applies to the whole tag
+        content = b'\x00Title \xff\x00\xe9'
+        frames = b'TIT2' + pack('>IH', len(content) - 1, 0) + content
+        tag = TinyTag.get('test.mp3', file_obj=id3(3, 0x80, frames))
+        self.assertEqual(tag.title, 'Title \xff\xe9')
+
+    def test_id3v2_utf_16_string_end(self) -> None:
+        # pylint: disable=protected-access
+        content = 'aĀb'.encode('utf-16-le') + b'\x00\x00c'
+        self.assertEqual(_ID3._find_string_end_pos(content, b'\x01'), 8)
+        self.assertEqual(_ID3._find_string_end_pos(b'a\x00\x00', b'\x01'), 0)
+        lines = [('first', 1500), ('Ā second', 61000)]
+        content = b'\x01eng\x02\x01\xff\xfe\x00\x00' + b''.join(
+            b'\xff\xfe' + text.encode('utf-16-le') + b'\x00\x00'
+            + pack('>I', time) for text, time in lines)
+        tag = _ID3()
+        self.assertEqual(
+            tag._parse_synced_lyrics(content),
+            '[00:01.50]first\n[01:01.00]Ā second')
+        self.assertEqual(
+            tag._parse_synced_lyrics(content + b'\xff\xfe\x00'),
+            '[00:01.50]first\n[01:01.00]Ā second')
+
+    def test_mp3_seek_table(self) -> None:
+        filename = os.path.join(SAMPLE_FOLDER, 'vbr_xing_header.mp3')
+        with open(filename, 'rb') as file_handle:
+            data = file_handle.read()
+        self.assertEqual(TinyTag.get(filename).seek_table, [])
+        # the Xing TOC maps each percent of the duration to a byte offset
+        tag = TinyTag.get(filename, seek_table=True)
+        self.assertEqual(len(tag.seek_table), 100)
+        self.assertEqual(tag.seek_table[0], (0.0, 0))
+        self.assertEqual(tag.seek_table, sorted(tag.seek_table))
+        self.assertAlmostEqual(tag.seek_table[50][0], tag.duration / 2)
+        # without a TOC, the offsets of all frames are scanned
+        # pylint: disable=protected-access
+        _ID3._USE_XING_HEADER = False
+        try:
+            tag = TinyTag.get(filename, seek_table=True)
+        finally:
+            _ID3._USE_XING_HEADER = True
+        times = [time for time, _offset in tag.seek_table]
+        self.assertEqual(len(times), int(tag.duration) + 1)
+        for second, time in enumerate(times):
+            self.assertTrue(second <= time < second + 0.1)
+        for _time, offset in tag.seek_table:
+            self.assertEqual(data[offset:offset + 2], b'\xff\xfb')
+
+    def test_mp3_exact_duration(self) -> None:
+        # MPEG-1 Layer III frames at 44100 Hz, the bitrate rises after a
+        # few frames, so the estimated duration is far off
+        def frames(bitrate_id: int, bitrate: int, count: int) -> bytes:
+            frame_length = 144000 * bitrate // 44100
+            header = b'\xff\xfb' + bytes((bitrate_id << 4, 0))
+            return (header + bytes(frame_length - 4)) * count
+
+        data = frames(1, 32, 10) + frames(14, 320, 500) + b'garbage'
+        tag = TinyTag.from_buffer(data)
+        self.assertGreater(tag.duration, 60)
+        tag = TinyTag.from_buffer(data, duration_mode='exact')
+        self.assertEqual(tag.duration, 510 * 1152 / 44100)
+        self.assertAlmostEqual(tag.bitrate, (10 * 32 + 500 * 320) / 510)
+        # a Xing frame at the start is not counted
+        xing = b'\xff\xfb\x10\x00' + bytes(32) + b'Xing'
+        xing += pack('>III', 3, 1, 104) + bytes(104 - len(xing) - 12)
+        tag = TinyTag.from_buffer(xing + data)
+        self.assertEqual(tag.duration, 1152 / 44100)
+        tag = TinyTag.from_buffer(xing + data, duration_mode='exact')
+        self.assertEqual(tag.duration, 510 * 1152 / 44100)
+        with self.assertRaises(ValueError):
+            TinyTag.from_buffer(data, duration_mode='slow')
+
+    def test_ogg_page_blocks(self) -> None:
+        # pages crossing the blocks read while walking the file
+        filenames = [
+            os.path.join(SAMPLE_FOLDER, name)
+            for name in os.listdir(SAMPLE_FOLDER)
+            if name.endswith(('.ogg', '.opus', '.oga', '.spx'))]
+
+        def properties(tag: TinyTag) -> tuple[object, ...]:
+            return (tag.as_dict(), tag.duration, tag.bitrate, tag.samplerate,
+                    tag.channels)
+
+        expected = {
+            filename: properties(TinyTag.get(filename))
+            for filename in filenames}
+        # pylint: disable=protected-access
+        block_size = _Ogg._PAGE_BLOCK_SIZE
+        _Ogg._PAGE_BLOCK_SIZE = 100
+        try:
+            for filename in filenames:
+                with self.subTest(filename=filename):
+                    self.assertEqual(
+                        properties(TinyTag.get(filename)), expected[filename])
+        finally:
+            _Ogg._PAGE_BLOCK_SIZE = block_size
+
+    def test_ogg_chained_streams(self) -> None:
+        filenames = [os.path.join(SAMPLE_FOLDER, name)
+                     for name in ('test.ogg', 'test.opus')]
+        data = b''
+        for filename in filenames:
+            with open(filename, 'rb') as file_handle:
+                data += file_handle.read()
+
+        def fields(tag: TinyTag) -> dict[str, object]:
+            return {key: value for key, value in tag.as_dict().items()
+                    if key not in {'filename', 'filesize'}}
+
+        expected = [TinyTag.get(filename) for filename in filenames]
+        tag = TinyTag.from_buffer(data)
+        self.assertEqual(tag.title, 'the boss')
+        self.assertEqual(len(tag.links), 2)
+        for link, expected_link in zip(tag.links, expected):
+            self.assertEqual(fields(link), fields(expected_link))
+        self.assertAlmostEqual(
+            tag.duration, sum(link.duration for link in expected))
+        # links are only found while determining the duration
+        self.assertEqual(TinyTag.from_buffer(data, duration=False).links, [])
+        # a multiplexed stream without audio (skeleton) is skipped
+        skeleton = b'fishead\x00' + bytes(56)
+        page = b'OggS\x00\x02' + pack('<qIII', 0, 7, 0, 0) + bytes(
+            (1, len(skeleton))) + skeleton
+        tag = TinyTag.from_buffer(page + data[:7467], filename='video.ogg')
+        self.assertEqual(fields(tag), fields(expected[0]))
+        self.assertEqual(tag.links, [])
+
+    def test_wma_header_object(self) -> None:
+        def asf_object(object_id: bytes, content: bytes) -> bytes:
+            return object_id + pack('<Q', len(content) + 24) + content
+
+        def content_description(title: str) -> bytes:
+            encoded = title.encode('utf-16-le') + b'\x00\x00'
+            return asf_object(
+                _Wma._ASF_CONTENT_DESC,  # pylint: disable=protected-access
+                pack('<5H', len(encoded), 0, 0, 0, 0) + encoded)
+
+        children = content_description('Title') + content_description('Two')
+        header = asf_object(
+            b'0&\xb2u\x8ef\xcf\x11\xa6\xd9\x00\xaa\x00b\xcel',
+            pack('<I', 1) + b'\x01\x02' + children)
+        # objects beyond the declared count and the header are ignored
+        data_object = asf_object(b'\x00' * 16, content_description('Data'))
+        tag = TinyTag.from_buffer(header + data_object, filename='test.wma')
+        self.assertEqual(tag.title, 'Title')
+        self.assertEqual(tag.other, {})
+
+    def test_riff_chunk_directory(self) -> None:
+        def chunk(chunk_id: bytes, content: bytes) -> bytes:
+            return chunk_id + pack('<I', len(content)) + content
+
+        fmt = chunk(b'fmt ', pack('<HHIIHH', 1, 1, 8000, 16000, 2, 16))
+        info = chunk(b'LIST', b'INFO' + chunk(b'INAM', b'Title\x00'))
+        audio = chunk(b'data', bytes(16000))
+        trailing = chunk(b'id3 ', b'garbage')
+        body = b'WAVE' + fmt + info + audio + trailing
+        data = b'RIFF' + pack('<I', len(body)) + body
+        tag = TinyTag.from_buffer(data, filename='test.wav')
+        self.assertEqual(tag.chunks, [
+            (b'fmt ', 20, 16), (b'LIST', 44, 18), (b'data', 70, 16000),
+            (b'id3 ', 16078, 7)])
+        self.assertEqual(tag.title, 'Title')
+        self.assertEqual(tag.duration, 1.0)
+        # parsing stops once all requested fields are found
+        tag = TinyTag.from_buffer(data, filename='test.wav', fields=['title'])
+        self.assertEqual(tag.chunks[-1], (b'data', 70, 16000))
+        self.assertEqual(tag.title, 'Title')
+        tag = TinyTag.from_buffer(data, filename='test.wav', tags=False)
+        self.assertEqual(tag.chunks[-1], (b'data', 70, 16000))
+        self.assertEqual(tag.duration, 1.0)
+        filename = os.path.join(SAMPLE_FOLDER, 'aiff_extra_tags.aiff')
+        self.assertEqual(TinyTag.get(filename, tags=False).chunks, [
+            (b'COMM', 20, 18), (b'SSND', 46, 17416)])
+
+    def test_riff_chunk_image_after_fields(self) -> None:
+        def chunk(chunk_id: bytes, content: bytes, fmt: str) -> bytes:
+            padding = b'\x00' * (len(content) % 2)
+            return chunk_id + pack(fmt, len(content)) + content + padding
+
+        filename = os.path.join(SAMPLE_FOLDER, 'wav_with_image.wav')
+        with open(filename, 'rb') as file:
+            id3 = file.read()[17210:17210 + 5692]
+        wav_body = (b'WAVE'
+                    + chunk(b'LIST', b'INFO' + chunk(
+                        b'INAM', b'Title\x00', '<I'), '<I')
+                    + chunk(b'id3 ', id3, '<I'))
+        aiff_body = (b'AIFF' + chunk(b'NAME', b'Title', '>I')
+                     + chunk(b'ID3 ', id3, '>I'))
+        for data in (b'RIFF' + pack('<I', len(wav_body)) + wav_body,
+                     b'FORM' + pack('>I', len(aiff_body)) + aiff_body):
+            with self.subTest(data=data[:4]):
+                # a requested image keeps the chunk walk going
+                tag = TinyTag.from_buffer(data, fields=['title'],
+                                          duration=False, image=True)
+                self.assertEqual(tag.title, 'Title')
+                image = tag.images.any
+                self.assertIsNotNone(image)
+                assert image is not None
+                self.assertEqual(image.mime_type, 'image/jpeg')
+                tag = TinyTag.from_buffer(data, fields=['title'],
+                                          duration=False)
+                self.assertEqual(len(tag.chunks), 1)
+
+    def test_rf64_large_file(self) -> None:
+        def chunk(chunk_id: bytes, content: bytes, size: int = -1) -> bytes:
+            if size < 0:
+                size = len(content)
+            return chunk_id + pack('<I', size) + content
+
+        data_size = 5_000_000_000
+        fmt = chunk(b'fmt ', pack('<HHIIHH', 1, 2, 48000, 192000, 4, 16))
+        ds64 = chunk(b'ds64', pack('<QQQI', 0, data_size, 0, 0))
+        head = (b'RF64\xff\xff\xff\xffWAVE' + ds64 + fmt
+                + chunk(b'data', b'', 0xFFFFFFFF))
+        tail = chunk(b'LIST', b'INFO' + chunk(b'INAM', b'Title\x00'))
+        filesize = len(head) + data_size + len(tail)
+        # the audio data is never read, only hopped over
+        tag = TinyTag.from_buffer(head, tail, filesize)
+        self.assertEqual(tag.duration, data_size / 192000)
+        self.assertEqual(tag.title, 'Title')
+        self.assertEqual(tag.chunks[2], (b'data', len(head), data_size))
+        # plain RIFF files over 4 GB may mark the data size as unknown
+        head = b'RIFF\xff\xff\xff\xffWAVE' + head[48:]
+        tag = TinyTag.from_buffer(head, b'', filesize, tags=False)
+        self.assertEqual(tag.duration, (filesize - len(head)) / 192000)
+
+    def test_binary_record(self) -> None:
+        for filename in (
+                'id3_xxx_lang.mp3', 'mpeg4_with_image.m4a', 'test.opus',
+                'flac_with_image.flac', 'lossless.wma'):
+            tag = TinyTag.get(os.path.join(SAMPLE_FOLDER, filename),
+                              image=True, lazy_images=True)
+            record = tag.to_bytes()
+            result = TinyTag.from_bytes(record)
+            self.assertEqual(result.as_dict(), tag.as_dict())
+            # lazily loaded images are read from the file
+            self.assertEqual(
+                [image.data for image in result.images.as_dict().get(
+                    'front_cover', [])],
+                [image.data for image in tag.images.as_dict().get(
+                    'front_cover', [])])
+            self.assertIsNone(TinyTag.from_bytes(
+                tag.to_bytes(images=False)).images.any)
+            self.assertEqual(
+                TinyTag.from_bytes(memoryview(record)).as_dict(),
+                tag.as_dict())
+        tag = TinyTag()
+        tag.filesize = 1 << 40
+        tag.duration = 1.5
+        tag.bitrate = 128
+        tag.track = -1
+        tag.title = 'Tïtle\x00'
+        tag.other['custom'] = ['a', '']
+        tag.other['bpm'] = ['120']
+        record = tag.to_bytes()
+        result = TinyTag.from_bytes(record)
+        self.assertEqual(result.as_dict(), tag.as_dict())
+        self.assertIsInstance(result.bitrate, int)
+        for invalid in (b'', b'T', b'TT', record[:3], b'XX\x01',
+                        b'TT\x01' + record[3:], record[:-1], record[:12],
+                        record[:2] + b'\x01'):
+            with self.assertRaises(ParseError):
+                TinyTag.from_bytes(invalid)
+        # value counts are not limited to 16 bits
+        tag = TinyTag()
+        tag.other['custom'] = [str(index) for index in range(70000)]
+        result = TinyTag.from_bytes(tag.to_bytes())
+        self.assertEqual(result.other['custom'], tag.other['custom'])
+
+    def test_mp4_moov_offset_cache(self) -> None:
+        filename = os.path.join(SAMPLE_FOLDER, 'mpeg4_with_image.m4a')
+        with open(filename, 'rb') as file_handle:
+            data = file_handle.read()
+        moov_offset = data.find(b'moov') - 4
+        tail = data[moov_offset:]
+        with self.assertRaises(BufferRangeError):
+            TinyTag.from_buffer(b'', tail, len(data), filename='uncached.m4a')
+        expected = TinyTag.from_buffer(data, filename='cached.m4a')
+        # the second parse seeks to the moov atom directly
+        tag = TinyTag.from_buffer(b'', tail, len(data), filename='cached.m4a')
+        self.assertEqual(tag.as_dict(), expected.as_dict())
+        self.assertEqual(tag.duration, expected.duration)
+
+    def test_mp4_moov_offset_cache_threads(self) -> None:
+        filename = os.path.join(SAMPLE_FOLDER, 'mpeg4_with_image.m4a')
+        with open(filename, 'rb') as file_handle:
+            data = file_handle.read()
+        expected = TinyTag.from_buffer(data).as_dict()
+
+        def parse(number: int) -> dict:
+            # distinct names fill the cache and evict entries concurrently
+            tag = TinyTag.from_buffer(
+                data, filename=f'threads{number % 300}.m4a')
+            tag.filename = None
+            return tag.as_dict()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for result in executor.map(parse, range(2000)):
+                self.assertEqual(result, expected)
+        self.assertLessEqual(
+            len(_MP4._moov_offsets), _MP4._MOOV_OFFSETS_MAX_SIZE)
+
+    def test_mp4_chapters(self) -> None:
+        def atom(atom_type: bytes, content: bytes) -> bytes:
+            return pack('>I', len(content) + 8) + atom_type + content
+
+        def full_atom(atom_type: bytes, content: bytes) -> bytes:
+            return atom(atom_type, b'\x00' * 4 + content)
+
+        ftyp = atom(b'ftyp', b'M4A \x00\x00\x02\x00M4A mp42isom')
+        mvhd = full_atom(b'mvhd', bytes(8) + pack('>II', 1000, 90000)
+                         + bytes(80))
+        # Nero chapters
+        chpl = full_atom(b'chpl', b'\x02' + b''.join(
+            pack('>QB', start, len(title)) + title
+            for start, title in ((0, b'Intro'), (305_000_000, b'Ende'))))
+        data = ftyp + atom(b'moov', mvhd + atom(b'udta', chpl))
+        tag = TinyTag.from_buffer(data, chapters=True)
+        self.assertEqual(tag.chapters, [(0.0, 'Intro'), (30.5, 'Ende')])
+        self.assertEqual(tag.duration, 90.0)
+        self.assertEqual(TinyTag.from_buffer(data).chapters, [])
+        # QuickTime chapter track, referenced by the audio track
+        texts = [pack('>H', 5) + b'Intro',
+                 pack('>H', 14) + b'\xfe\xff' + 'Teil 2'.encode('utf-16-be'),
+                 pack('>H', 4) + b'Ende']
+        text_offset = len(ftyp) + 8
+        mdat = atom(b'mdat', b''.join(texts))
+
+        def trak(track_id: int, handler: bytes, extra: bytes,
+                 stbl: bytes) -> bytes:
+            return atom(b'trak', full_atom(
+                b'tkhd', bytes(8) + pack('>I', track_id) + bytes(68))
+                + extra + atom(b'mdia', full_atom(
+                    b'mdhd', bytes(8) + pack('>II', 600, 54000) + bytes(4))
+                + full_atom(b'hdlr', bytes(4) + handler + bytes(13))
+                + atom(b'minf', atom(b'stbl', stbl))))
+
+        audio_trak = trak(
+            1, b'soun', atom(b'tref', atom(b'chap', pack('>I', 2))),
+            full_atom(b'stsz', pack('>II', 0, 2) + pack('>2I', 100, 100)))
+        text_stbl = (
+            full_atom(b'stts', pack('>I', 2) + pack('>4I', 2, 6000, 1, 600))
+            + full_atom(b'stsz', pack('>II', 0, 3)
+                        + pack('>3I', *(len(text) for text in texts)))
+            + full_atom(b'stsc', pack('>I', 2) + pack('>6I', 1, 2, 1, 2, 1, 1))
+            + full_atom(b'stco', pack('>I', 2) + pack(
+                '>2I', text_offset,
+                text_offset + len(texts[0]) + len(texts[1]))))
+        moov = atom(b'moov', mvhd + audio_trak + trak(
+            2, b'text', b'', text_stbl))
+        data = ftyp + mdat + moov
+        tag = TinyTag.from_buffer(data, chapters=True)
+        self.assertEqual(
+            tag.chapters, [(0.0, 'Intro'), (10.0, 'Teil 2'), (20.0, 'Ende')])
+        self.assertEqual(tag.duration, 90.0)
+
+    def test_parsers_imported_on_demand(self) -> None:
+        project_folder = os.path.dirname(os.path.dirname(SAMPLE_FOLDER))
+        output = check_output(
+            [executable, '-c',
+             'import sys, tinytag; '
+             'print(sorted(m for m in sys.modules if m.startswith("tinytag")))'
+             ], cwd=os.path.dirname(project_folder))
+        self.assertEqual(
+            output.decode().strip(), "['tinytag', 'tinytag.tinytag']")
+
+    def test_register_parser(self) -> None:
+        class CustomTag(TinyTag):
+            def _parse_tag(self, fh: BinaryIO) -> None:
+                self._set_field('title', fh.read(4)[2:].decode())
+
+            def _determine_duration(self, fh: BinaryIO) -> None:
+                self.duration = 1.0
+
+        mapping = dict(TinyTag._file_extension_mapping)
+        magic_mapping = list(TinyTag._magic_header_mapping)
+        extensions = TinyTag.SUPPORTED_FILE_EXTENSIONS
+        try:
+            TinyTag.register_parser(
+                CustomTag, extensions=('CST', '.mp3'),
+                magic=lambda header: header.startswith(b'CT'))
+            self.assertTrue(TinyTag.is_supported('song.cst'))
+            self.assertEqual(
+                TinyTag.SUPPORTED_FILE_EXTENSIONS, extensions + ('.cst',))
+            tag = TinyTag.get('song.cst', file_obj=BytesIO(b'CTab'))
+            self.assertIsInstance(tag, CustomTag)
+            self.assertEqual(tag.title, 'ab')
+            self.assertEqual(tag.duration, 1.0)
+            tag = TinyTag.get(file_obj=BytesIO(b'CTcd'))
+            self.assertEqual(tag.title, 'cd')
+            tag = TinyTag.get(os.path.join(SAMPLE_FOLDER, 'cbr.mp3'))
+            self.assertIsInstance(tag, CustomTag)
+            TinyTag.register_parser('tinytag._flac:_Flac', extensions=('.x',))
+            tag = TinyTag.get(os.path.join(SAMPLE_FOLDER, 'detect_flac.x'))
+            self.assertIsInstance(tag, _Flac)
+        finally:
+            TinyTag._file_extension_mapping = mapping
+            TinyTag._magic_header_mapping = magic_mapping
+            TinyTag.SUPPORTED_FILE_EXTENSIONS = extensions
+
     def test_show_hint_for_wrong_usage(self) -> None:
         with self.assertRaises(ValueError) as context:
             TinyTag.get()
@@ -1,5 +1,5 @@
 import { definePlugin, callable } from "@decky/api";
-import { PanelSection, PanelSectionRow, SliderField, Focusable, DialogButton, ModalRoot, showModal } from "@decky/ui";
+import { PanelSection, PanelSectionRow, SliderField, TextField, Focusable, DialogButton, ModalRoot, showModal } from "@decky/ui";
 import { useState, useEffect, useRef } from "react";
 import { FaPlay, FaPause } from "react-icons/fa";
 import { FaBackwardStep, FaForwardStep } from "react-icons/fa6";
@@ -30,10 +30,18 @@ type TrackInfo = {
   bitdepth?: number;
 };
 
-const getPlaylist = callable<[], TrackInfo[]>("get_playlist");
+type Chapter = {
+  start: number;
+  title: string;
+};
+
+const getPlaylistSize = callable<[], number>("get_playlist_size");
+const getPlaylistPage = callable<[number, number, string[]], TrackInfo[]>("get_playlist_page");
+const searchTracks = callable<[string, number, string[]], TrackInfo[]>("search");
 const loadTrack = callable<[number], TrackInfo>("load_track");
-const getTrackMetadata = callable<[number], TrackInfo>("get_track_metadata");
 const getInitialTrack = callable<[], number>("get_initial_track");
+const getChapters = callable<[number], Chapter[]>("get_chapters");
+const getExactDuration = callable<[number], number | null>("get_exact_duration");
 const getVolume = callable<[], number>("get_volume");
 const setVolume = callable<[number], void>("set_volume");
 const getRepeat = callable<[], boolean>("get_repeat");
@@ -41,6 +49,10 @@ const setRepeat = callable<[boolean], void>("set_repeat");
 
 let audio: HTMLAudioElement | null = null;
 
+// the playlist modal shows the library one page at a time
+const PAGE_SIZE = 50;
+const PAGE_FIELDS = ["index", "title", "artist", "duration", "cover"];
+
 export default definePlugin(() => ({name: "SimpleAudio", icon: <FaPlay/>,content: <Content/>}));
 
 function AutoScrollText({ text, style }: { text: string; style?: React.CSSProperties; }) {
@@ -78,7 +90,8 @@ function AutoScrollText({ text, style }: { text: string; style?: React.CSSProper
 }
 
 function Content() {
-  const [playlist, setPlaylist] = useState<TrackInfo[]>([]);
+  const [trackCount, setTrackCount] = useState(0);
+  const [track, setTrack] = useState<TrackInfo | null>(null);
   const [current, setCurrent] = useState(0);
   const [playing, setPlaying] = useState(false);
   const [progress, setProgress] = useState(0);
@@ -89,29 +102,19 @@ function Content() {
   const [repeat, setRepeatState] = useState(false);
   const [initialized, setInitialized] = useState(false);
   const isSeekingRef = useRef(false);
-  const currentRef = useRef(current);
   const repeatRef = useRef(repeat);
-  const playlistRef = useRef<TrackInfo[]>(playlist);
   
-  useEffect(() => {
-    currentRef.current = current;
-  }, [current]);
-
-  useEffect(() => {
-    playlistRef.current = playlist;
-  }, [playlist]);
-
   useEffect(() => {
     repeatRef.current = repeat;
   }, [repeat]);
 
   useEffect(() => {
     (async () => {
-      const list = await getPlaylist();
+      const count = await getPlaylistSize();
       const initial = await getInitialTrack();
       const vol = await getVolume();
       const rep = await getRepeat();
-      setPlaylist(list);
+      setTrackCount(count);
       setCurrent(initial);
       setVolumeState(vol);
       setRepeatState(rep);
@@ -157,8 +160,9 @@ function Content() {
         return;
       }
 
-      const nextIndex = currentRef.current + 1;
-      if (nextIndex < playlistRef.current.length) {
+      const { count, index } = await syncPlaylist();
+      const nextIndex = index + 1;
+      if (nextIndex < count) {
         await playTrack(nextIndex);
       } else {
         setPlaying(false);
@@ -185,23 +189,35 @@ function Content() {
   }, []);
 
   useEffect(() => {
-    if (!audio || playlist.length === 0 || !initialized) return;
+    if (!audio || trackCount === 0 || !initialized) return;
     (async () => {
-      const track = await loadTrack(current);
-      updatePlaylistTrack(track);
+      const loaded = await loadTrack(current);
+      setTrack(loaded);
+      refreshExactDuration(current);
       if (!audio.src) {
-        audio.src = track.url!;
+        audio.src = loaded.url!;
         audio.load();
       }
     })();
-  }, [playlist, initialized]);
-
-  const updatePlaylistTrack = (track: TrackInfo) => {
-    setPlaylist(prev => {
-      const copy = [...prev];
-      copy[track.index] = { ...copy[track.index], ...track };
-      return copy;
-    });
+  }, [trackCount, initialized]);
+
+  const syncPlaylist = async () => {
+    // a rescan may add or remove tracks, the loaded one is found again by its path
+    const [count, index] = await Promise.all([getPlaylistSize(), getInitialTrack()]);
+    setTrackCount(count);
+    setCurrent(index);
+    setTrack(prev => prev ? { ...prev, index } : prev);
+    return { count, index };
+  };
+
+  const refreshExactDuration = async (index: number) => {
+    // mp3 durations are estimated, the exact one is counted in the background
+    try {
+      const exact = await getExactDuration(index);
+      if (exact) {
+        setTrack(prev => prev && prev.index === index ? { ...prev, duration: exact } : prev);
+      }
+    } catch {}
   };
   
   const loadTrackSilently = async (index: number) => {
@@ -212,13 +228,20 @@ function Content() {
     setProgress(0);
     setDuration(0);
 
-    const track = await loadTrack(index);
-    if (!track.url) {
+    let loaded: TrackInfo;
+    try {
+      loaded = await loadTrack(index);
+    } catch {
+      setError(true);
+      return;
+    }
+    if (!loaded.url) {
       setError(true);
       return;
     }
-    updatePlaylistTrack(track);
-    audio.src = track.url;
+    setTrack(loaded);
+    refreshExactDuration(index);
+    audio.src = loaded.url;
     audio.volume = volume;
     audio.load();
     setCurrent(index);
@@ -233,13 +256,20 @@ function Content() {
     setProgress(0);
     setDuration(0);
 
-    const track = await loadTrack(index);
-    if (!track.url) {
+    let loaded: TrackInfo;
+    try {
+      loaded = await loadTrack(index);
+    } catch {
       setError(true);
       return;
     }
-    updatePlaylistTrack(track);
-    audio.src = track.url;
+    if (!loaded.url) {
+      setError(true);
+      return;
+    }
+    setTrack(loaded);
+    refreshExactDuration(index);
+    audio.src = loaded.url;
     audio.volume = volume;
     audio.load();
 
@@ -254,7 +284,7 @@ function Content() {
 
   const togglePlay = async () => {
     if (!audio) return;
-    if (!audio.src && playlist.length > 0) {
+    if (!audio.src && trackCount > 0) {
       await playTrack(current);
       return;
     }
@@ -268,20 +298,22 @@ function Content() {
   };
 
   const nextTrack = async () => {
-    if (current + 1 >= playlist.length) return;
+    const { count, index } = await syncPlaylist();
+    if (index + 1 >= count) return;
     if (playing) {
-      await playTrack(current + 1);
+      await playTrack(index + 1);
     } else {
-      await loadTrackSilently(current + 1);
+      await loadTrackSilently(index + 1);
     }
   };
 
   const prevTrack = async () => {
-    if (current <= 0) return;
+    const { index } = await syncPlaylist();
+    if (index <= 0) return;
     if (playing) {
-      await playTrack(current - 1);
+      await playTrack(index - 1);
     } else {
-      await loadTrackSilently(current - 1);
+      await loadTrackSilently(index - 1);
     }
   };
 
@@ -320,25 +352,11 @@ function Content() {
   };
 
   const showPlaylistModal = async () => {
-    const updatedPlaylist = await Promise.all(
-      playlist.map(async (track) => {
-        if (!track.cover) {
-          try {
-            const meta = await getTrackMetadata(track.index);
-            return { ...track, ...meta };
-          } catch {
-            return track;
-          }
-        }
-        return track;
-      })
-    );
-    setPlaylist(updatedPlaylist);
+    const { count, index } = await syncPlaylist();
     showModal(
       <PlaylistModal
-        playlist={updatedPlaylist}
-        current={current}
-        playing={playing}
+        trackCount={count}
+        current={index}
         onSelect={async (index) => {
           if (playing) {
             await playTrack(index);
@@ -350,17 +368,35 @@ function Content() {
     );
   };
 
-  function PlaylistModal({playlist, current, playing, onSelect, closeModal}: {playlist: TrackInfo[]; current: number; playing: boolean; onSelect: (index: number) => void; closeModal?: () => void}) {
+  function PlaylistModal({trackCount, current, onSelect, closeModal}: {trackCount: number; current: number; onSelect: (index: number) => void; closeModal?: () => void}) {
+    // starts on the page of the current track, other pages are fetched on demand
+    const [offset, setOffset] = useState(current - current % PAGE_SIZE);
+    const [page, setPage] = useState<TrackInfo[]>([]);
+    const [query, setQuery] = useState("");
+
+    useEffect(() => {
+      let cancelled = false;
+      // a query shows the first matches instead of the page
+      const request = query.trim() ? searchTracks(query, PAGE_SIZE, PAGE_FIELDS) : getPlaylistPage(offset, PAGE_SIZE, PAGE_FIELDS);
+      request
+        .then(tracks => { if (!cancelled) setPage(tracks); })
+        .catch(() => {});
+      return () => { cancelled = true; };
+    }, [offset, query]);
+
     return (
       <ModalRoot onCancel={closeModal} onOK={closeModal}>
+        <div style={{ marginBottom: 8 }}>
+          <TextField label="Search" value={query} onChange={(e) => setQuery(e.target.value)}/>
+        </div>
         <div style={{maxHeight: "65vh", overflowY: "auto", display: "flex", flexDirection: "column", gap: 6,}}>
-          {playlist.map((track, index) => {
-            const isCurrent = index === current;
+          {page.map((track) => {
+            const isCurrent = track.index === current;
             return (
-              <Focusable key={index} onActivate={() => { onSelect(index); closeModal?.();}}>
+              <Focusable key={track.index} onActivate={() => { onSelect(track.index); closeModal?.();}}>
                 <div style={{display: "flex", alignItems: "center", padding: "8px 10px", borderRadius: 8, cursor: "pointer", background: isCurrent? "rgba(0, 200, 255, 0.2)": "transparent",transition: "background 0.15s"}}>
                   <div style={{ width: 40, height: 40, marginRight: 10, flexShrink: 0 }}>
-                    {track.cover && track.cover_mime ? (<img src={`data:${track.cover_mime};base64,${track.cover}`} style={{width: "100%",height: "100%",objectFit: "cover",borderRadius: 4,}}/>
+                    {track.cover ? (<img src={track.cover} style={{width: "100%",height: "100%",objectFit: "cover",borderRadius: 4,}}/>
                     ) : (
                       <div style={{width: "100%", height: "100%", background: "#444", borderRadius: 4, display: "flex", alignItems: "center", justifyContent: "center", color: "#aaa", fontSize: 12}}>
                         ?
@@ -383,6 +419,13 @@ function Content() {
             );
           })}
         </div>
+        {!query.trim() && (<Focusable style={{ marginTop: 12, display: "flex", alignItems: "center", gap: 8 }} flow-children="horizontal">
+          <DialogButton style={{ flex: 1 }} disabled={offset === 0} onClick={() => setOffset(Math.max(0, offset - PAGE_SIZE))}>Previous</DialogButton>
+          <div style={{ fontSize: 12, opacity: 0.7, whiteSpace: "nowrap" }}>
+            {trackCount > 0 ? `${offset + 1}-${Math.min(offset + PAGE_SIZE, trackCount)} / ${trackCount}` : "0 / 0"}
+          </div>
+          <DialogButton style={{ flex: 1 }} disabled={offset + PAGE_SIZE >= trackCount} onClick={() => setOffset(offset + PAGE_SIZE)}>Next</DialogButton>
+        </Focusable>)}
         <div style={{ marginTop: 12 }}>
           <DialogButton onClick={closeModal}>Close</DialogButton>
         </div>
@@ -390,16 +433,22 @@ function Content() {
     );
   }
 
-  const showTrackMetadataModal = (track: TrackInfo) => { showModal(<TrackMetadataModal track={track} />,undefined); };
+  const showTrackMetadataModal = async (track: TrackInfo) => {
+    let chapters: Chapter[] = [];
+    try {
+      chapters = await getChapters(track.index);
+    } catch {}
+    showModal(<TrackMetadataModal track={track} chapters={chapters} onSeek={handleSeek} />,undefined);
+  };
 
-  function TrackMetadataModal({ track, closeModal }: { track: TrackInfo; closeModal?: () => void }) {
+  function TrackMetadataModal({ track, chapters, onSeek, closeModal }: { track: TrackInfo; chapters: Chapter[]; onSeek: (value: number) => void; closeModal?: () => void }) {
     return (
       <ModalRoot onCancel={closeModal} onOK={closeModal}>
         <div style={{ display: "flex", flexDirection: "column", alignItems: "flex-start", maxHeight: "80vh", overflowY: "auto", marginBottom: "8px", gap: 16, borderRadius: 12}}>
           <Focusable onClick={() => {}} onActivate={() => {}}>
             <div tabIndex={0} style={{fontSize: 22, fontWeight: 600,textAlign: "center",width: "100%",cursor: "pointer", borderRadius: 4, padding: "2px 0",transition: "background 0.2s"}}>Cover art</div>
           </Focusable>
-          {track.cover && track.cover_mime && (<img src={`data:${track.cover_mime};base64,${track.cover}`} style={{maxHeight: 200, width: "auto", maxWidth: "100%", borderRadius: 12, objectFit: "contain"}}/>)}
+          {track.cover && (<img src={track.cover} style={{maxHeight: 200, width: "auto", maxWidth: "100%", borderRadius: 12, objectFit: "contain"}}/>)}
           <Focusable onClick={() => {}} onActivate={() => {}}>
             <div tabIndex={0} style={{fontSize: 22, fontWeight: 600, textAlign: "center", width: "100%", cursor: "pointer", borderRadius: 4, padding: "2px 0", transition: "background 0.2s"}}>Details</div>
           </Focusable>
@@ -418,6 +467,19 @@ function Content() {
             {track.full_path && (<div><b>Path:</b> {track.full_path}</div>)}
             {track.filesize && (<div><b>Size:</b> {(track.filesize / 1_000_000).toFixed(2)} MB</div>)}
           </div>
+          {chapters.length > 0 && (
+            <div style={{ display: "flex", flexDirection: "column", width: "100%", marginTop: 16, gap: 4 }}>
+              <div style={{ fontSize: 22, fontWeight: 600 }}>Chapters</div>
+              {chapters.map((chapter, index) => (
+                <Focusable key={index} onActivate={() => { onSeek(chapter.start); closeModal?.(); }}>
+                  <div style={{ display: "flex", justifyContent: "space-between", padding: "4px 10px", borderRadius: 8, cursor: "pointer" }}>
+                    <span>{chapter.title || `Chapter ${index + 1}`}</span>
+                    <span style={{ opacity: 0.7 }}>{formatTime(chapter.start)}</span>
+                  </div>
+                </Focusable>
+              ))}
+            </div>
+          )}
         <div style={{ marginTop: 16 }}>
           <DialogButton onClick={closeModal}>Close</DialogButton>
         </div>
@@ -425,13 +487,11 @@ function Content() {
     );
   }
 
-  const track = playlist[current];
-
   return (
     <PanelSection>
       <PanelSectionRow>
         <div style={{display: "flex",alignItems: "center",width: "100%",marginLeft: -14}}>
-          {track?.cover && track?.cover_mime && (<img src={`data:${track.cover_mime};base64,${track.cover}`} style={{width: 80, height: 80, borderRadius: 6, marginRight: 10, objectFit: "cover",flexShrink: 0,}}/>)}
+          {track?.cover && (<img src={track.cover} style={{width: 80, height: 80, borderRadius: 6, marginRight: 10, objectFit: "cover",flexShrink: 0,}}/>)}
           <div style={{ display: "flex", flexDirection: "column", minWidth: 0 }}>
               <AutoScrollText text={track?.title ?? "No track selected"}style={{ fontWeight: 600 }}/>
               <AutoScrollText text={track?.artist ?? "Unknown artist"}style={{ fontSize: 12, opacity: 0.75 }}/>
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import types
+import unittest
+from http.client import HTTPConnection
+from io import BytesIO
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+# Decky puts py_modules on the path and provides the decky module
+sys.path[:0] = [str(root), str(root / "py_modules")]
+sys.modules.setdefault("decky", types.SimpleNamespace(logger=logging.getLogger("decky")))
+
+import main  # noqa: E402
+from main import copy_range, parse_byte_range, unsatisfiable_range  # noqa: E402
+
+
+class ByteRangeTest(unittest.TestCase):
+    def test_whole_file(self):
+        for header in (None, "", "items=0-1", "bytes=", "bytes=-", "bytes=a-b", "bytes=5-2"):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_byte_range(header, 100))
+
+    def test_closed_range(self):
+        self.assertEqual(parse_byte_range("bytes=0-0", 100), (0, 0))
+        self.assertEqual(parse_byte_range("bytes=10-19", 100), (10, 19))
+        # the end is clamped to the file size
+        self.assertEqual(parse_byte_range("bytes=90-200", 100), (90, 99))
+
+    def test_open_ended_range(self):
+        self.assertEqual(parse_byte_range("bytes=0-", 100), (0, 99))
+        self.assertEqual(parse_byte_range("bytes=99-", 100), (99, 99))
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_byte_range("bytes=-10", 100), (90, 99))
+        # a suffix longer than the file is the whole file
+        self.assertEqual(parse_byte_range("bytes=-500", 100), (0, 99))
+
+    def test_multi_range(self):
+        # multipart responses are not supported, the whole file is served
+        self.assertIsNone(parse_byte_range("bytes=0-9,20-29", 100))
+
+    def test_unsatisfiable_range(self):
+        for header, size in (("bytes=100-", 100), ("bytes=100-200", 100), ("bytes=-0", 100),
+                             ("bytes=0-", 0), ("bytes=-10", 0)):
+            with self.subTest(header=header, size=size):
+                self.assertEqual(parse_byte_range(header, size), unsatisfiable_range)
+
+    def test_copy_range(self):
+        data = bytes(range(256)) * 16
+        dst = BytesIO()
+        src = BytesIO(data)
+        src.seek(100)
+        copy_range(src, dst, 1000)
+        self.assertEqual(dst.getvalue(), data[100:1100])
+
+    def test_copy_range_blocks(self):
+        data = bytes(range(256)) * 16
+        block_size = main.range_block_size
+        main.range_block_size = 100
+        try:
+            dst = BytesIO()
+            copy_range(BytesIO(data), dst, 1050)
+            self.assertEqual(dst.getvalue(), data[:1050])
+            # stops at the end of a truncated file
+            dst = BytesIO()
+            copy_range(BytesIO(data[:50]), dst, 1000)
+            self.assertEqual(dst.getvalue(), data[:50])
+        finally:
+            main.range_block_size = block_size
+
+
+class RangeRequestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        music_dir = Path(self.tmp.name)
+        (music_dir / "song.mp3").write_bytes(bytes(range(100)))
+        (music_dir / "empty.mp3").write_bytes(b"")
+        self.plugin = main.Plugin()
+        self.plugin.config = {"audio_library": str(music_dir)}
+        self.plugin.playlist = [music_dir / "song.mp3", music_dir / "empty.mp3"]
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.plugin.http_port = sock.getsockname()[1]
+        self.plugin._start_http_server()
+        deadline = time.monotonic() + 5
+        while self.plugin.http_server is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.plugin.http_server.shutdown()
+        self.plugin.http_server.server_close()
+        self.plugin.http_thread.join(timeout=2)
+        self.tmp.cleanup()
+
+    def request(self, path, byte_range=None):
+        connection = HTTPConnection("127.0.0.1", self.plugin.http_port, timeout=5)
+        try:
+            connection.request("GET", path, headers={"Range": byte_range} if byte_range else {})
+            response = connection.getresponse()
+            return response.status, response.headers, response.read()
+        finally:
+            connection.close()
+
+    def test_partial_content(self):
+        status, headers, body = self.request("/song.mp3", "bytes=90-")
+        self.assertEqual(status, 206)
+        self.assertEqual(headers["Content-Range"], "bytes 90-99/100")
+        self.assertEqual(headers["Content-Length"], "10")
+        self.assertEqual(body, bytes(range(90, 100)))
+        status, headers, body = self.request("/song.mp3", "bytes=0-9,20-29")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, bytes(range(100)))
+
+    def test_unsatisfiable(self):
+        for path, byte_range, size in (("/song.mp3", "bytes=100-", 100), ("/empty.mp3", "bytes=0-", 0)):
+            with self.subTest(path=path):
+                status, headers, body = self.request(path, byte_range)
+                self.assertEqual(status, 416)
+                self.assertEqual(headers["Content-Range"], f"bytes */{size}")
+                self.assertEqual(headers["Content-Length"], "0")
+                self.assertEqual(body, b"")
+
+    def test_cover(self):
+        music_dir = Path(self.tmp.name)
+        shutil.copy(root / "py_modules/tinytag/tests/samples/mpeg4_with_image.m4a", music_dir / "with image.m4a")
+        rel_paths = ["with image.m4a", "song.mp3"]
+        rows = [main.Plugin._snapshot_row(music_dir / path, path, (music_dir / path).stat()) for path in rel_paths]
+        snapshot_file = music_dir / "library.snapshot"
+        main.LibrarySnapshot.write(snapshot_file, music_dir, rows)
+        self.plugin.library = self.plugin.playlist = main.LibrarySnapshot(snapshot_file)
+        self.plugin._index_tracks(rel_paths)
+        page = asyncio.run(self.plugin.get_playlist_page(0, 2, ["index", "title", "cover"]))
+        # the urls come from the snapshot, no tags are read
+        self.assertEqual(self.plugin.playlist_meta, {})
+        prefix = f"http://127.0.0.1:{self.plugin.http_port}"
+        self.assertTrue(page[0]["cover"].startswith(f"{prefix}/.cover/with%20image.m4a?v="))
+        status, headers, body = self.request(page[0]["cover"][len(prefix):])
+        self.assertEqual((status, headers["Content-Type"]), (200, "image/jpeg"))
+        self.assertEqual(body[:2], b"\xff\xd8")
+        self.assertEqual(len(body), 1220)
+        # tracks without an image and files outside the library get the default cover
+        default_status = 200 if main.cover_art_path.exists() else 404
+        for path in (page[1]["cover"][len(prefix):], "/.cover/library.snapshot"):
+            with self.subTest(path=path):
+                status, headers, body = self.request(path)
+                self.assertEqual(status, default_status)
+                self.assertNotEqual(headers["Content-Type"], "image/jpeg")
+
+
+def id3_file(path, frames):
+    # ID3v2.3 tag with text frames, without audio
+    data = b"".join(frame_id + (len(text) + 1).to_bytes(4, "big") + b"\0\0\0" + text for frame_id, text in frames)
+    size = bytes((len(data) >> shift) & 0x7f for shift in (21, 14, 7, 0))
+    path.write_bytes(b"ID3\3\0\0" + size + data)
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.music_dir = Path(self.tmp.name)
+        self.snapshot_file = main.snapshot_file
+        main.snapshot_file = self.music_dir / "library.snapshot"
+
+    def tearDown(self):
+        main.snapshot_file = self.snapshot_file
+        self.tmp.cleanup()
+
+    def test_out_of_range_numbers(self):
+        path = self.music_dir / "song.mp3"
+        id3_file(path, [(b"TIT2", b"Title"), (b"TRCK", b"99999999999"), (b"TPOS", b"2")])
+        row = main.Plugin._snapshot_row(path, "song.mp3", path.stat())
+        self.assertEqual((row["title"], row["track"], row["disc"]), ("Title", 0, 2))
+        main.LibrarySnapshot.write(main.snapshot_file, self.music_dir, [row])
+        library = main.LibrarySnapshot(main.snapshot_file)
+        self.assertEqual(library.row(0), row)
+
+    def test_save_updates_keeps_newer_snapshot(self):
+        path = self.music_dir / "song.mp3"
+        id3_file(path, [(b"TIT2", b"Title")])
+        row = main.Plugin._snapshot_row(path, "song.mp3", path.stat())
+        main.LibrarySnapshot.write(main.snapshot_file, self.music_dir, [row])
+        plugin = main.Plugin()
+        plugin.library = main.LibrarySnapshot(main.snapshot_file)
+        plugin.track_paths = ["song.mp3"]
+        plugin._update_snapshot_row(0, duration=5.0, duration_exact=1)
+        # written by a refresh, but not handed over to the session yet
+        main.LibrarySnapshot.write(main.snapshot_file, self.music_dir, [dict(row, title="Newer")])
+        plugin._save_snapshot_updates()
+        library = main.LibrarySnapshot(main.snapshot_file)
+        self.assertEqual((library.string("title", 0), library.number("duration_exact", 0)), ("Newer", 0))
+        plugin.library = library
+        plugin._save_snapshot_updates()
+        library = main.LibrarySnapshot(main.snapshot_file)
+        self.assertEqual((library.string("title", 0), library.number("duration", 0)), ("Newer", 5.0))
+
+
+    def test_facets_before_snapshot(self):
+        paths = [self.music_dir / "a.mp3", self.music_dir / "b.mp3"]
+        id3_file(paths[0], [(b"TPE1", b"Artist"), (b"TALB", b"Album")])
+        id3_file(paths[1], [(b"TPE1", b"Other")])
+        plugin = main.Plugin()
+        plugin.playlist = paths
+        plugin._index_tracks(["a.mp3", "b.mp3"])
+        # tracks are only grouped once their tags are known
+        self.assertEqual(asyncio.run(plugin.get_artists()), [])
+        plugin._track_meta(0)
+        self.assertEqual(asyncio.run(plugin.get_artists()), [{"artist": "Artist", "albums": 1, "tracks": 1}])
+
+
+if __name__ == "__main__":
+    unittest.main()